@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import argparse
 import concurrent.futures
+import errno
+import hashlib
 import json
 import logging
 import os
@@ -12,6 +14,7 @@ import subprocess
 import sys
 import tempfile
 import threading
+import time
 from pathlib import Path
 from typing import Dict, Optional, Any, List, Tuple
 
@@ -51,6 +54,16 @@ DEFAULT_CONFIG = {
     "log_file": str(Path.cwd() / "draxon.log"),
     "parallel_download": False,
     "max_workers": 2,
+    "http_chunk_size": "",
+    "buffer_size": "",
+    "preallocate": False,
+    "staging_dir": "",
+    "fsync_policy": "none",
+    "subtitles_fallback": False,
+    "asr_backend": "whisper",
+    "asr_model": "small",
+    "asr_language": "",
+    "asr_workers": 1,
     "profiles": {
         "default": {}
     }
@@ -134,6 +147,11 @@ def edit_list_in_editor(items: List[str]) -> List[str]:
         console.print(f"[yellow]Ошибка чтения временного файла: {e}[/yellow]")
         return items
 
+def parse_bool(v: Any) -> bool:
+    if isinstance(v, str):
+        return v.strip().lower() in ("1", "true", "yes", "on", "y")
+    return bool(v)
+
 def parse_url_spec(token: str) -> Tuple[str, Dict[str, Any]]:
     parts = token.split("||", 1)
     url = parts[0].strip()
@@ -171,13 +189,297 @@ def _signal_handler(sig, frame):
 signal.signal(signal.SIGINT, _signal_handler)
 signal.signal(signal.SIGTERM, _signal_handler)
 
+# -------------------------
+# Disk I/O (staging dir, fsync, per-job stats)
+# -------------------------
+FSYNC_POLICIES = ("none", "file", "dir")
+
+def split_outtmpl_dir(outtmpl: str) -> Tuple[Path, str]:
+    p = Path(outtmpl).expanduser()
+    static: List[str] = []
+    for part in p.parts[:-1]:
+        if "%(" in part:
+            break
+        static.append(part)
+    base = Path(*static) if static else Path(".")
+    return base, str(Path(*p.parts[len(static):]))
+
+def _fsync_path(path: Path) -> None:
+    fd = os.open(str(path), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def finalize_staged_file(src: Path, dest: Path, fsync_policy: str = "none") -> Path:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(src, dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # другой раздел: копируем рядом с целью и атомарно переименовываем
+        tmp = dest.with_name(f".{dest.name}.draxon-part")
+        shutil.copy2(src, tmp)
+        if fsync_policy != "none":
+            _fsync_path(tmp)
+        os.replace(tmp, dest)
+        os.unlink(src)
+    else:
+        if fsync_policy != "none":
+            _fsync_path(dest)
+    if fsync_policy == "dir":
+        try:
+            _fsync_path(dest.parent)
+        except OSError:
+            pass
+    return dest
+
+_delayacct_enabled: Optional[bool] = None
+
+def delayacct_enabled() -> bool:
+    # delayacct_blkio_ticks всегда 0, если kernel.task_delayacct выключен (по умолчанию с 5.14)
+    global _delayacct_enabled
+    if _delayacct_enabled is None:
+        try:
+            _delayacct_enabled = Path("/proc/sys/kernel/task_delayacct").read_text().strip() == "1"
+        except Exception:
+            _delayacct_enabled = False
+    return _delayacct_enabled
+
+def thread_io_snapshot() -> Dict[str, float]:
+    snap: Dict[str, float] = {}
+    task_dir = Path("/proc/self/task") / str(threading.get_native_id())
+    if delayacct_enabled():
+        try:
+            fields = (task_dir / "stat").read_text().rsplit(")", 1)[1].split()
+            # поле 42 (delayacct_blkio_ticks); после "comm" счёт идёт с поля 3
+            snap["blkio_wait"] = int(fields[39]) / os.sysconf("SC_CLK_TCK")
+        except Exception:
+            pass
+    try:
+        for line in (task_dir / "io").read_text().splitlines():
+            k, _, v = line.partition(":")
+            if k in ("read_bytes", "write_bytes"):
+                snap[k] = int(v)
+    except Exception:
+        pass
+    return snap
+
+def format_bytes(n: Optional[float]) -> str:
+    if n is None:
+        return "?"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024:
+            return f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}TiB"
+
+class FinalizeFilesPP(yt_dlp.postprocessor.PostProcessor):
+    def __init__(self, downloader=None, staging_dir: Optional[str] = None, final_dir: Optional[str] = None,
+                 fsync_policy: str = "none", stats: Optional[Dict[str, float]] = None):
+        super().__init__(downloader)
+        self.staging_dir = Path(staging_dir) if staging_dir else None
+        self.final_dir = Path(final_dir) if final_dir else None
+        self.fsync_policy = fsync_policy if fsync_policy in FSYNC_POLICIES else "none"
+        self.stats = stats if stats is not None else {}
+
+    def _target(self, path: Path) -> Optional[Path]:
+        if not self.staging_dir or not self.final_dir:
+            return None
+        try:
+            return self.final_dir / path.relative_to(self.staging_dir)
+        except ValueError:
+            return None
+
+    def _finalize(self, filepath: Optional[str]) -> Optional[str]:
+        if not filepath or not os.path.exists(filepath):
+            return filepath
+        src = Path(filepath)
+        dest = self._target(src)
+        if dest is None:
+            if self.fsync_policy != "none":
+                _fsync_path(src)
+            return filepath
+        return str(finalize_staged_file(src, dest, self.fsync_policy))
+
+    def run(self, info):
+        started = time.perf_counter()
+        info["filepath"] = self._finalize(info.get("filepath"))
+        for sub in (info.get("requested_subtitles") or {}).values():
+            if isinstance(sub, dict) and sub.get("filepath"):
+                sub["filepath"] = self._finalize(sub["filepath"])
+        self.stats["finalize"] = self.stats.get("finalize", 0.0) + time.perf_counter() - started
+        return [], info
+
+class SkipFinalizedPP(FinalizeFilesPP):
+    # outtmpl указывает в staging, поэтому штатная проверка yt-dlp "already downloaded"
+    # не видит готовый файл в output_dir — проверяем его сами перед загрузкой
+    def __init__(self, downloader=None, skip_default: bool = False, final_exts: Optional[List[str]] = None, **kwargs):
+        super().__init__(downloader, **kwargs)
+        self.skip_default = skip_default
+        self.final_exts = final_exts or []
+
+    def run(self, info):
+        filename = info.get("_filename") or info.get("filepath")
+        dest = self._target(Path(filename)) if filename else None
+        if dest is not None and not dest.exists():
+            # после FFmpegExtractAudio итоговое расширение отличается от скачиваемого
+            dest = next((dest.with_suffix(f".{ext}") for ext in self.final_exts if dest.with_suffix(f".{ext}").exists()), dest)
+        exists = dest is not None and dest.exists()
+        self._downloader.params["skip_download"] = exists or self.skip_default
+        if exists:
+            logging.info("Уже есть в %s: %s — пропускаю", self.final_dir, dest.name)
+            for sub in (info.get("requested_subtitles") or {}).values():
+                if isinstance(sub, dict) and sub.get("filepath"):
+                    sub["filepath"] = self._finalize(sub["filepath"])
+        return [], info
+
+# -------------------------
+# Subtitle stage (yt_subs transcript lookup + ASR fallback)
+# -------------------------
+def load_yt_subs():
+    # импорт ленивый: yt_subs тянет whisper/torch, которые нужны только этой стадии
+    try:
+        import yt_subs
+        return yt_subs
+    except Exception as e:
+        console.print(f"[yellow]yt_subs недоступен ({e}) — fallback субтитров отключён[/yellow]")
+        return None
+
+def is_youtube_url(u: str) -> bool:
+    return bool(re.search(r"(?:^|[/.])(?:youtube\.com|youtu\.be)/", u))
+
+class SubtitleStage:
+    def __init__(self, yt_subs_mod, langs: List[str], asr_spec, asr_language: Optional[str] = None,
+                 lookup_workers: int = 2, asr_workers: int = 1):
+        self.yt_subs = yt_subs_mod
+        self.langs = langs
+        self.asr_spec = asr_spec
+        self.asr_language = asr_language or None
+        self.lookup_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, lookup_workers), thread_name_prefix="subs-lookup")
+        self.asr_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, asr_workers), thread_name_prefix="subs-asr")
+        self._lookups: Dict[Tuple[str, Tuple[str, ...]], concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        # число файлов, для которых субтитры ещё в работе (lookup -> ASR)
+        self._active = 0
+        self._idle = threading.Condition(self._lock)
+
+    def _begin(self):
+        with self._idle:
+            self._active += 1
+
+    def _end(self):
+        with self._idle:
+            self._active -= 1
+            self._idle.notify_all()
+
+    def lookup(self, vid: str, langs: List[str]) -> concurrent.futures.Future:
+        key = (vid, tuple(langs))
+        with self._lock:
+            fut = self._lookups.get(key)
+            if fut is None:
+                fut = self.lookup_pool.submit(self.yt_subs.get_transcript_cached, vid, list(langs) or None, False)
+                self._lookups[key] = fut
+        return fut
+
+    def prefetch(self, url: str, langs: Optional[List[str]] = None):
+        if not is_youtube_url(url):
+            return
+        try:
+            vid = self.yt_subs.extract_video_id(url)
+        except ValueError:
+            return
+        self.lookup(vid, langs if langs is not None else self.langs)
+
+    def handle(self, info: Dict[str, Any], langs: Optional[List[str]] = None):
+        media = info.get("filepath")
+        if not media or not os.path.exists(media) or _shutdown.is_set():
+            return
+        for sub in (info.get("requested_subtitles") or {}).values():
+            if isinstance(sub, dict) and sub.get("filepath") and os.path.exists(sub["filepath"]):
+                return
+        langs = langs if langs is not None else self.langs
+        out_srt = str(Path(media).with_suffix(".srt"))
+        # after_move срабатывает и для "already downloaded" — не перезаписываем готовые субтитры
+        if os.path.exists(out_srt):
+            return
+        self._begin()
+        if info.get("extractor_key") == "Youtube" and info.get("id"):
+            fut = self.lookup(info["id"], langs)
+            fut.add_done_callback(lambda f: self._on_lookup(f, media, out_srt))
+        else:
+            self._submit_asr(media, out_srt)
+
+    def _on_lookup(self, fut: concurrent.futures.Future, media: str, out_srt: str):
+        try:
+            self.yt_subs.write_subtitles(fut.result(), out_srt)
+            logging.info("Субтитры (youtube_transcript_api): %s", out_srt)
+            self._end()
+            return
+        except Exception as e:
+            logging.info("Транскрипт недоступен для %s: %s — ставлю в очередь ASR", media, e)
+        self._submit_asr(media, out_srt)
+
+    def _submit_asr(self, media: str, out_srt: str):
+        if _shutdown.is_set():
+            self._end()
+            return
+        try:
+            fut = self.asr_pool.submit(self._run_asr, media, out_srt)
+        except RuntimeError:
+            # пул уже остановлен после Ctrl-C
+            self._end()
+            return
+        fut.add_done_callback(lambda f: self._end() if f.cancelled() else None)
+
+    def _run_asr(self, media: str, out_srt: str):
+        try:
+            if _shutdown.is_set():
+                return
+            logging.info("ASR (%s/%s): %s", self.asr_spec.backend, self.asr_spec.model_name, media)
+            self.yt_subs.transcribe_audio(media, out_srt, language=self.asr_language, asr=self.asr_spec)
+        except Exception:
+            logging.exception("ASR не удался: %s", media)
+        finally:
+            self._end()
+
+    def wait(self):
+        # lookup-колбэки могут добавлять задачи ASR, поэтому ждём по счётчику,
+        # а не по пулам; короткий таймаут оставляет место для Ctrl-C
+        try:
+            with self._idle:
+                while self._active and not _shutdown.is_set():
+                    self._idle.wait(timeout=0.5)
+        except KeyboardInterrupt:
+            _shutdown.set()
+        cancel = _shutdown.is_set()
+        if cancel:
+            logging.info("Стадия субтитров: отменяю ожидающие задачи, текущий ASR завершится сам")
+        self.lookup_pool.shutdown(wait=not cancel, cancel_futures=cancel)
+        self.asr_pool.shutdown(wait=not cancel, cancel_futures=cancel)
+
+class SubtitleStagePP(yt_dlp.postprocessor.PostProcessor):
+    def __init__(self, downloader=None, stage: Optional[SubtitleStage] = None, langs: Optional[List[str]] = None):
+        super().__init__(downloader)
+        self.stage = stage
+        self.langs = langs
+
+    def run(self, info):
+        try:
+            self.stage.handle(info, self.langs)
+        except Exception:
+            logging.exception("Ошибка стадии субтитров")
+        return [], info
+
 # -------------------------
 # Download manager (progress)
 # -------------------------
 class DownloadManager:
-    def __init__(self, base_opts: Dict[str, Any], max_workers: int = 2):
+    def __init__(self, base_opts: Dict[str, Any], max_workers: int = 2, subtitle_stage: Optional[SubtitleStage] = None):
         self.base_opts = base_opts
         self.max_workers = max_workers
+        self.subtitle_stage = subtitle_stage
         self.progress = Progress(
             SpinnerColumn(),
             TextColumn("[bold blue]{task.fields[title]}", justify="left"),
@@ -190,6 +492,8 @@ class DownloadManager:
         )
         self._task_map = {}
         self._task_lock = threading.Lock()
+        # файл -> [байт при первом событии, последние байты, время первого, время последнего]
+        self._transfers: Dict[str, List[float]] = {}
 
     def _progress_hook(self, d: Dict[str, Any]):
         if _shutdown.is_set():
@@ -199,6 +503,8 @@ class DownloadManager:
         key = info.get("id") or info.get("url") or d.get("filename") or d.get("tmpfilename") or str(info.get("webpage_url","")) or str(id(d))
         with self._task_lock:
             task_id = self._task_map.get(key)
+            if status in ("downloading", "finished"):
+                self._track_transfer(d)
             if status == "downloading":
                 downloaded = d.get("downloaded_bytes") or 0
                 total = d.get("total_bytes") or d.get("total_bytes_estimate") or None
@@ -229,6 +535,20 @@ class DownloadManager:
                     except Exception:
                         pass
 
+    def _track_transfer(self, d: Dict[str, Any]):
+        # считаем только байты, переданные в этом запуске: при докачке
+        # downloaded_bytes начинается не с нуля, а total_bytes — размер всего файла
+        name = d.get("tmpfilename") or d.get("filename")
+        downloaded = d.get("downloaded_bytes")
+        if not name or downloaded is None:
+            return
+        now = time.monotonic()
+        rec = self._transfers.get(name)
+        if rec is None:
+            self._transfers[name] = [downloaded, downloaded, now, now]
+        else:
+            rec[1], rec[3] = downloaded, now
+
     def _build_opts(self, extra: Dict[str, Any]) -> Dict[str, Any]:
         opts = dict(self.base_opts)
         opts.update(extra)
@@ -241,14 +561,47 @@ class DownloadManager:
     def _run_single(self, url: str, opts: Dict[str, Any]):
         if _shutdown.is_set():
             return
+        io_opts = opts.pop("__io__", None)
+        io_stats: Dict[str, float] = {}
+        before = thread_io_snapshot()
+        started = time.perf_counter()
         try:
             logging.info("Start: %s", url)
             with yt_dlp.YoutubeDL(opts) as ydl:
+                if io_opts:
+                    ydl.add_post_processor(FinalizeFilesPP(ydl, stats=io_stats, **io_opts), when="after_move")
+                    if io_opts.get("staging_dir"):
+                        final_exts = [pp.get("preferredcodec") for pp in opts.get("postprocessors") or []
+                                      if pp.get("key") == "FFmpegExtractAudio" and pp.get("preferredcodec")]
+                        ydl.add_post_processor(SkipFinalizedPP(ydl, skip_default=bool(opts.get("skip_download")),
+                                                               final_exts=final_exts, **io_opts), when="before_dl")
+                if self.subtitle_stage:
+                    langs = opts.get("subtitleslangs")
+                    self.subtitle_stage.prefetch(url, langs)
+                    ydl.add_post_processor(SubtitleStagePP(ydl, self.subtitle_stage, langs), when="after_move")
                 ydl.download([url])
         except Exception:
             logging.exception("Ошибка при скачивании %s", url)
+        finally:
+            self._log_io(url, before, thread_io_snapshot(), time.perf_counter() - started, io_stats)
+
+    def _log_io(self, url: str, before: Dict[str, float], after: Dict[str, float], elapsed: float, io_stats: Dict[str, float]):
+        def delta(key):
+            if key in before and key in after:
+                return after[key] - before[key]
+            return None
+        wait = delta("blkio_wait")
+        logging.info(
+            "I/O: %s — wall %.1fs, io wait %s, written %s (без ffmpeg/aria2c), finalize %.2fs",
+            url,
+            elapsed,
+            f"{wait:.2f}s" if wait is not None else "n/a",
+            format_bytes(delta("write_bytes")),
+            io_stats.get("finalize", 0.0),
+        )
 
     def download(self, jobs: List[Tuple[str, Dict[str, Any]]], parallel: bool = False):
+        self._transfers = {}
         if parallel and len(jobs) > 1:
             console.print(f"[magenta]Параллельный режим: {self.max_workers} потоков[/magenta]")
             with self.progress:
@@ -271,6 +624,12 @@ class DownloadManager:
                     if _shutdown.is_set(): break
                     opts = self._build_opts(overrides)
                     self._run_single(url, opts)
+        # скорость одной загрузки: байты / время активной передачи каждого файла,
+        # чтобы параллельный и последовательный режимы давали сравнимую оценку
+        transferred = sum(max(0, rec[1] - rec[0]) for rec in self._transfers.values())
+        active = sum(rec[3] - rec[2] for rec in self._transfers.values())
+        if transferred >= 8 * 1024**2 and active > 1:
+            record_bandwidth(transferred / active)
 
 # -------------------------
 # UI and input logic
@@ -334,7 +693,7 @@ def smart_input_and_profiles(cfg: Dict[str, Any], cli_args: argparse.Namespace)
 
     console.print("[bold]Текущий профиль (merged):[/bold]")
     tbl = Table("Key", "Value", show_header=True, header_style="bold magenta")
-    for k in ("output_dir", "output_template", "video_format", "subtitles_languages", "proxy", "rate_limit", "resume_download", "parallel_download", "max_workers"):
+    for k in ("output_dir", "output_template", "video_format", "subtitles_languages", "proxy", "rate_limit", "resume_download", "parallel_download", "max_workers", "http_chunk_size", "buffer_size", "preallocate", "staging_dir", "fsync_policy", "subtitles_fallback", "asr_backend", "asr_model"):
         tbl.add_row(k, str(active_cfg.get(k)))
     console.print(tbl)
 
@@ -510,6 +869,224 @@ def smart_input_and_profiles(cfg: Dict[str, Any], cli_args: argparse.Namespace)
 
     return jobs, active_cfg, profile_name
 
+# -------------------------
+# Batch planner (--plan)
+# -------------------------
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "draxon"
+PLAN_CACHE_TTL = 24 * 3600
+PLAN_DISK_RESERVE = 0.05
+BANDWIDTH_FILE = CACHE_DIR / "bandwidth.json"
+
+def load_bandwidth() -> Optional[float]:
+    try:
+        return float(json.loads(BANDWIDTH_FILE.read_text(encoding="utf-8"))["bytes_per_sec"])
+    except Exception:
+        return None
+
+def record_bandwidth(bytes_per_sec: float) -> None:
+    prev = load_bandwidth()
+    value = bytes_per_sec if prev is None else 0.7 * prev + 0.3 * bytes_per_sec
+    try:
+        BANDWIDTH_FILE.parent.mkdir(parents=True, exist_ok=True)
+        BANDWIDTH_FILE.write_text(json.dumps({"bytes_per_sec": value, "updated": time.time()}), encoding="utf-8")
+    except Exception:
+        logging.debug("Не удалось сохранить оценку скорости", exc_info=True)
+
+def _plan_cache_path(url: str, opts: Dict[str, Any]) -> Path:
+    pps = [pp.get("preferredcodec") for pp in opts.get("postprocessors") or []]
+    key = json.dumps([url, opts.get("format"), opts.get("noplaylist"), pps], sort_keys=True)
+    return CACHE_DIR / "plan" / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+def _format_size(f: Dict[str, Any], duration: Optional[float]) -> Tuple[Optional[float], bool]:
+    if f.get("filesize"):
+        return float(f["filesize"]), True
+    if f.get("filesize_approx"):
+        return float(f["filesize_approx"]), False
+    if f.get("tbr") and duration:
+        return float(f["tbr"]) * 1000 / 8 * float(duration), False
+    return None, False
+
+def summarize_info(info: Dict[str, Any], opts: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if info.get("entries") is not None:
+        out: List[Dict[str, Any]] = []
+        for entry in info["entries"]:
+            if entry:
+                out.extend(summarize_info(entry, opts))
+        return out
+
+    duration = info.get("duration")
+    formats = info.get("requested_formats") or [info]
+    size, exact = 0.0, True
+    for f in formats:
+        fsize, fexact = _format_size(f, duration)
+        if fsize is None:
+            size, exact = None, False
+            break
+        size += fsize
+        exact = exact and fexact
+
+    notes: List[str] = []
+    transcode = False
+    extra = 0.0
+    if len(formats) > 1:
+        notes.append("merge")
+        # до слияния на диске лежат и исходные потоки, и результат
+        if size is not None:
+            extra += size
+    for pp in opts.get("postprocessors") or []:
+        if pp.get("key") == "FFmpegExtractAudio":
+            codec = pp.get("preferredcodec")
+            acodec = next((f.get("acodec") for f in formats if f.get("acodec") not in (None, "none")), None)
+            if not acodec or not str(acodec).startswith(str(codec)):
+                transcode = True
+                notes.append(f"{acodec or '?'}→{codec}")
+                if duration:
+                    extra += float(pp.get("preferredquality") or 192) * 1000 / 8 * float(duration)
+    return [{
+        "id": info.get("id"),
+        "title": info.get("title") or info.get("id"),
+        "format_id": info.get("format_id"),
+        "size": size,
+        "exact": exact,
+        "disk": (size + extra) if size is not None else None,
+        "transcode": transcode,
+        "notes": notes,
+    }]
+
+def resolve_job_plan(url: str, opts: Dict[str, Any], use_cache: bool = True) -> List[Dict[str, Any]]:
+    cache_path = _plan_cache_path(url, opts)
+    if use_cache and cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            if time.time() - cached.get("time", 0) < PLAN_CACHE_TTL:
+                return cached["entries"]
+        except Exception:
+            pass
+
+    plan_opts = {k: v for k, v in opts.items() if not k.startswith("__") and k != "progress_hooks"}
+    plan_opts.update({"quiet": True, "no_warnings": True, "skip_download": True})
+    with yt_dlp.YoutubeDL(plan_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    entries = summarize_info(info or {}, opts)
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({"time": time.time(), "url": url, "entries": entries}, ensure_ascii=False), encoding="utf-8")
+    except Exception:
+        logging.debug("Не удалось сохранить кэш плана", exc_info=True)
+    return entries
+
+def _existing_dir(p: Path) -> Path:
+    p = p.expanduser().resolve()
+    while not p.exists() and p != p.parent:
+        p = p.parent
+    return p
+
+def _device(p: Path) -> int:
+    return os.stat(str(p)).st_dev
+
+def plan_batch(jobs: List[Tuple[str, Dict[str, Any]]], cfg: Dict[str, Any], use_cache: bool = True,
+               bandwidth: Optional[float] = None) -> bool:
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(jobs)
+    errors: Dict[int, str] = {}
+    with console.status(f"[cyan]Разрешаю форматы для {len(jobs)} заданий...[/cyan]"):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, max(1, len(jobs)))) as exe:
+            futs = {exe.submit(resolve_job_plan, url, opts, use_cache): i for i, (url, opts) in enumerate(jobs)}
+            for fut in concurrent.futures.as_completed(futs):
+                i = futs[fut]
+                try:
+                    results[i] = fut.result()
+                except Exception as e:
+                    errors[i] = str(e)
+
+    resolved = len(jobs) - len(errors)
+    workers = min(cfg.get("max_workers", 2), resolved) if cfg.get("parallel_download") and resolved > 1 else 1
+    stream_speed = load_bandwidth()
+    if bandwidth and not stream_speed:
+        stream_speed = bandwidth / workers
+
+    tbl = Table("№", "Название", "Формат", "Размер", "Заметки", show_header=True, header_style="bold magenta")
+    # путь -> (нужно под готовые файлы, нужно под staging)
+    need_by_dir: Dict[Path, List[float]] = {}
+    total = 0.0
+    seconds = 0.0
+    longest = 0.0
+    unknown = 0
+    no_speed = False
+    for i, (url, opts) in enumerate(jobs):
+        if i in errors:
+            tbl.add_row(str(i + 1), url, "-", "-", f"[red]ошибка: {errors[i]}[/red]")
+            continue
+        io_opts = opts.get("__io__") or {}
+        target = _existing_dir(Path(io_opts.get("final_dir") or split_outtmpl_dir(opts.get("outtmpl", "."))[0]))
+        staging = _existing_dir(Path(io_opts["staging_dir"])) if io_opts.get("staging_dir") else None
+        # на том же разделе финализация — простой rename: staged-файл и есть итоговый
+        if staging is not None and _device(staging) == _device(target):
+            staging = None
+        rate = opts.get("ratelimit")
+        speed = min(x for x in (stream_speed, rate) if x) if (stream_speed or rate) else None
+        job_seconds = 0.0
+        for entry in results[i] or []:
+            size = entry.get("size")
+            if size is None:
+                unknown += 1
+                size_txt = "?"
+            else:
+                total += size
+                if speed:
+                    job_seconds += size / speed
+                else:
+                    no_speed = True
+                disk = entry.get("disk") or size
+                need_by_dir.setdefault(target, [0.0, 0.0])[0] += disk
+                if staging is not None:
+                    # в staging одновременно лежит не больше одного файла на поток
+                    slot = need_by_dir.setdefault(staging, [0.0, 0.0])
+                    slot[1] = max(slot[1], disk * workers)
+                size_txt = ("" if entry.get("exact") else "~") + format_bytes(size)
+            notes = ", ".join(entry.get("notes") or [])
+            if entry.get("transcode"):
+                notes = f"[yellow]transcode[/yellow] {notes}"
+            tbl.add_row(str(i + 1), str(entry.get("title")), str(entry.get("format_id") or "-"), size_txt, notes or "-")
+        seconds += job_seconds
+        longest = max(longest, job_seconds)
+    console.print(tbl)
+
+    # записи одного задания качаются последовательно, поэтому
+    # самое долгое задание ограничивает выигрыш от потоков
+    eta_seconds = max(seconds / workers, longest)
+    if bandwidth:
+        eta_seconds = max(eta_seconds, total / bandwidth)
+    if total and eta_seconds and not no_speed:
+        eta = f"~{eta_seconds / 60:.1f} мин при {format_bytes(total / eta_seconds)}/s ({workers} поток.)"
+    else:
+        eta = "n/a (скорость неизвестна, задайте --bandwidth)"
+    console.print(f"[bold]Итого:[/bold] {format_bytes(total)}"
+                  + (f" (+{unknown} без оценки размера)" if unknown else "")
+                  + f" · время: {eta}")
+
+    # разные папки вывода могут оказаться на одном разделе — тогда место общее
+    need_by_dev: Dict[int, List[Any]] = {}
+    for path, (final_need, staging_need) in need_by_dir.items():
+        dev = _device(path)
+        slot = need_by_dev.setdefault(dev, [[], 0.0])
+        slot[0].append(str(path))
+        slot[1] += final_need + staging_need
+
+    ok = True
+    for paths, need in need_by_dev.values():
+        free = shutil.disk_usage(paths[0]).free
+        required = need * (1 + PLAN_DISK_RESERVE)
+        where = ", ".join(paths)
+        if required > free:
+            ok = False
+            console.print(f"[red]{where}: нужно {format_bytes(required)}, свободно {format_bytes(free)} — не хватит места[/red]")
+        else:
+            console.print(f"[green]{where}: нужно {format_bytes(required)}, свободно {format_bytes(free)}[/green]")
+    if errors:
+        console.print(f"[yellow]Не удалось разрешить {len(errors)} заданий — они не учтены в оценке[/yellow]")
+    return ok
+
 # -------------------------
 # Main orchestration
 # -------------------------
@@ -549,6 +1126,29 @@ def build_ydl_opts_from_job(job_overrides: Dict[str, Any], base_cfg: Dict[str, A
     rl = parse_rate_limit_to_int(rl_str)
     if rl:
         opts["ratelimit"] = rl
+    chunk = parse_rate_limit_to_int(job_overrides.get("http_chunk_size") or base_cfg.get("http_chunk_size"))
+    if chunk:
+        opts["http_chunk_size"] = chunk
+    buf = parse_rate_limit_to_int(job_overrides.get("buffer_size") or base_cfg.get("buffer_size"))
+    if buf:
+        opts["buffersize"] = buf
+        opts["noresizebuffer"] = True
+    if parse_bool(job_overrides.get("preallocate", base_cfg.get("preallocate"))):
+        opts["external_downloader"] = {"default": "aria2c"}
+        opts["external_downloader_args"] = {"aria2c": ["--file-allocation=falloc"]}
+    staging = job_overrides.get("staging_dir") or base_cfg.get("staging_dir")
+    fsync_policy = str(job_overrides.get("fsync") or base_cfg.get("fsync_policy") or "none").lower()
+    io_opts: Dict[str, Any] = {}
+    if staging:
+        final_dir, rel_tmpl = split_outtmpl_dir(outtmpl)
+        staging_dir = Path(staging).expanduser()
+        opts["outtmpl"] = str(staging_dir / rel_tmpl)
+        io_opts["staging_dir"] = str(staging_dir)
+        io_opts["final_dir"] = str(final_dir)
+    if fsync_policy in FSYNC_POLICIES and fsync_policy != "none":
+        io_opts["fsync_policy"] = fsync_policy
+    if io_opts:
+        opts["__io__"] = io_opts
     if job_overrides.get("writesubtitles") or base_cfg.get("subtitles_languages"):
         if job_overrides.get("subtitleslangs"):
             opts["writesubtitles"] = True
@@ -583,10 +1183,14 @@ def main(argv=None):
     parser.add_argument("--audio", action="store_true", help="extract audio for all URLs")
     parser.add_argument("--playlist", action="store_true", help="download playlist")
     parser.add_argument("--subtitles", help="subtitles languages comma-separated")
+    parser.add_argument("--subs-fallback", action="store_true", help="if a video has no captions, fetch them via yt_subs or run ASR on the downloaded file")
     parser.add_argument("--proxy", help="proxy")
     parser.add_argument("--rate", help="rate limit string like 500K")
     parser.add_argument("--parallel", action="store_true", help="parallel downloads")
     parser.add_argument("--max-workers", type=int, default=cfg.get("max_workers", 2), help="max threads")
+    parser.add_argument("--plan", action="store_true", help="resolve formats first, report sizes/time/disk and refuse to start if disk would overflow")
+    parser.add_argument("--bandwidth", help="total bandwidth for --plan estimate like 5M (default: per-download speed measured on previous runs)")
+    parser.add_argument("--no-plan-cache", action="store_true", help="ignore cached metadata for --plan")
     parser.add_argument("--save-config", action="store_true", help="save merged profile back to config")
     args = parser.parse_args(argv)
 
@@ -612,6 +1216,8 @@ def main(argv=None):
         active_cfg["max_workers"] = args.max_workers
     if args.audio:
         active_cfg["prefer_audio"] = True
+    if args.subs_fallback:
+        active_cfg["subtitles_fallback"] = True
 
     final_jobs: List[Tuple[str, Dict[str, Any]]] = []
     for url, job_ov in jobs:
@@ -636,14 +1242,44 @@ def main(argv=None):
         else:
             console.print("[yellow]ffmpeg не найден в PATH — извлечение аудио не будет работать[/yellow]")
 
-    manager = DownloadManager(base_opts={}, max_workers=active_cfg.get("max_workers", 2))
+    need_aria2 = any(job[1].get("external_downloader") for job in final_jobs)
+    if need_aria2 and shutil.which("aria2c") is None:
+        console.print("[yellow]aria2c не найден — preallocate работать не будет (pkg/apt install aria2)[/yellow]")
+    if any(job[1].get("external_downloader") and (job[1].get("http_chunk_size") or job[1].get("buffersize")) for job in final_jobs):
+        console.print("[yellow]preallocate включает aria2c: http_chunk_size и buffer_size действуют только "
+                      "для встроенного загрузчика yt-dlp и будут проигнорированы[/yellow]")
 
     console.clear()
     print_header(active_cfg, profile_name)
+    if args.plan:
+        fits = plan_batch(final_jobs, active_cfg, use_cache=not args.no_plan_cache,
+                          bandwidth=parse_rate_limit_to_int(args.bandwidth))
+        if not fits:
+            console.print("[red]Недостаточно места на диске — загрузка не начата.[/red]")
+            return
+        if not Confirm.ask("Начать загрузку?", default=True):
+            console.print("[yellow]Отменено пользователем[/yellow]")
+            return
+
+    subtitle_stage = None
+    if active_cfg.get("subtitles_fallback"):
+        yt_subs_mod = load_yt_subs()
+        if yt_subs_mod is not None:
+            langs = [l.strip() for l in str(active_cfg.get("subtitles_languages", "")).split(",") if l.strip()]
+            asr_spec = yt_subs_mod.AsrSpec(active_cfg.get("asr_backend", "whisper"), active_cfg.get("asr_model", "small"), None, 0)
+            subtitle_stage = SubtitleStage(yt_subs_mod, langs, asr_spec, asr_language=active_cfg.get("asr_language"),
+                                           lookup_workers=active_cfg.get("max_workers", 2),
+                                           asr_workers=int(active_cfg.get("asr_workers", 1) or 1))
+
+    manager = DownloadManager(base_opts={}, max_workers=active_cfg.get("max_workers", 2), subtitle_stage=subtitle_stage)
+
     console.print(f"[bold]Начинаю скачивание {len(final_jobs)} файлов (parallel={active_cfg.get('parallel_download')})[/bold]")
 
     try:
         manager.download(final_jobs, parallel=bool(active_cfg.get("parallel_download")))
+        if subtitle_stage:
+            console.print("[cyan]Жду завершения стадии субтитров (lookup/ASR)...[/cyan]")
+            subtitle_stage.wait()
     except Exception:
         logging.exception("Critical download error")
     finally:
@@ -0,0 +1,75 @@
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("yt_dlp")
+pytest.importorskip("rich")
+
+import draxon
+
+
+def test_split_outtmpl_dir_static_prefix():
+    base, rel = draxon.split_outtmpl_dir("/data/media/%(uploader)s/%(title)s.%(ext)s")
+    assert base == Path("/data/media")
+    assert rel == str(Path("%(uploader)s/%(title)s.%(ext)s"))
+
+
+def test_split_outtmpl_dir_without_directory():
+    base, rel = draxon.split_outtmpl_dir("%(title)s.%(ext)s")
+    assert base == Path(".")
+    assert rel == "%(title)s.%(ext)s"
+
+
+def test_split_outtmpl_dir_expands_user():
+    base, _ = draxon.split_outtmpl_dir("~/Videos/%(title)s.%(ext)s")
+    assert base == Path.home() / "Videos"
+
+
+def test_finalize_staged_file_moves_into_new_dir(tmp_path):
+    src = tmp_path / "staging" / "a.mp4"
+    src.parent.mkdir()
+    src.write_bytes(b"data")
+    dest = tmp_path / "final" / "sub" / "a.mp4"
+
+    assert draxon.finalize_staged_file(src, dest, "dir") == dest
+    assert dest.read_bytes() == b"data"
+    assert not src.exists()
+
+
+def test_finalize_staged_file_cross_device_fallback(tmp_path, monkeypatch):
+    src = tmp_path / "a.mp4"
+    src.write_bytes(b"data")
+    os.utime(src, (1_000_000, 1_000_000))
+    dest = tmp_path / "final" / "a.mp4"
+    real_replace = os.replace
+    calls = []
+
+    def fake_replace(a, b):
+        calls.append((Path(a), Path(b)))
+        if len(calls) == 1:
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        return real_replace(a, b)
+
+    monkeypatch.setattr(draxon.os, "replace", fake_replace)
+    draxon.finalize_staged_file(src, dest, "file")
+
+    assert dest.read_bytes() == b"data"
+    assert not src.exists()
+    assert calls[1] == (dest.with_name(".a.mp4.draxon-part"), dest)
+    assert dest.stat().st_mtime == 1_000_000
+    assert list(dest.parent.iterdir()) == [dest]
+
+
+def test_finalize_staged_file_reraises_other_errors(tmp_path, monkeypatch):
+    src = tmp_path / "a.mp4"
+    src.write_bytes(b"data")
+
+    def fake_replace(a, b):
+        raise OSError(errno.EACCES, "Permission denied")
+
+    monkeypatch.setattr(draxon.os, "replace", fake_replace)
+    with pytest.raises(OSError):
+        draxon.finalize_staged_file(src, tmp_path / "final" / "a.mp4")
+    assert src.exists()
@@ -0,0 +1,117 @@
+import http.server
+import io
+import shutil
+import threading
+import wave
+
+import pytest
+
+import yt_subs
+
+DATA = bytes(range(256)) * 400
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    data = DATA
+    cap = None
+    ignore_range = False
+    cut_at = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.ranges.append(self.headers.get("Range"))
+        size = len(self.data)
+        if self.ignore_range or not self.headers.get("Range"):
+            self.send_response(200)
+            self.send_header("Content-Length", str(size))
+            self.end_headers()
+            self.wfile.write(self.data)
+            return
+        start, end = self.headers["Range"].split("=", 1)[1].split("-")
+        start, end = int(start), min(int(end), size - 1)
+        if start >= size:
+            self.send_response(416)
+            self.end_headers()
+            return
+        if self.cap:
+            end = min(end, start + self.cap - 1)
+        if self.cut_at is not None and start >= self.cut_at:
+            end = start - 1
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(self.data[start:end + 1])
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**attrs):
+        handler = type("Handler", (RangeHandler,), attrs)
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.ranges = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_port}/audio"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def read_all(url, chunk_size):
+    return b"".join(yt_subs.iter_http_ranges(url, {"X-Test": "1"}, chunk_size=chunk_size))
+
+
+def test_reads_in_ranged_chunks(serve):
+    server, url = serve()
+    assert read_all(url, 40000) == DATA
+    assert server.ranges[:2] == ["bytes=0-39999", "bytes=40000-79999"]
+    assert len(server.ranges) == 3
+
+
+def test_exact_multiple_of_chunk_size(serve):
+    server, url = serve()
+    assert read_all(url, len(DATA) // 4) == DATA
+    assert len(server.ranges) == 4
+
+
+def test_server_capping_ranges_is_not_truncated(serve):
+    server, url = serve(cap=4096)
+    assert read_all(url, 40000) == DATA
+    assert len(server.ranges) == 25
+
+
+def test_server_ignoring_range_returns_whole_body(serve):
+    server, url = serve(ignore_range=True)
+    assert read_all(url, 4096) == DATA
+    assert len(server.ranges) == 1
+
+
+def test_early_end_of_stream_raises(serve):
+    _, url = serve(cut_at=50000)
+    with pytest.raises(RuntimeError):
+        read_all(url, 40000)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg не найден")
+def test_decode_audio_stream_from_ranges(serve):
+    np = pytest.importorskip("numpy")
+    samples = (np.sin(np.arange(yt_subs.SAMPLE_RATE) / 10) * 10000).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(yt_subs.SAMPLE_RATE)
+        w.writeframes(samples.tobytes())
+    server, url = serve(data=buf.getvalue(), cap=8192)
+
+    audio = yt_subs.decode_audio_stream(url, {"X-Test": "1"}, chunk_size=16384)
+    assert len(audio) == len(samples)
+    assert np.allclose(audio, samples / 32768.0, atol=1e-4)
+    assert len(server.ranges) > 1
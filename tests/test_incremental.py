@@ -0,0 +1,64 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import yt_subs
+
+SR = yt_subs.SAMPLE_RATE
+
+
+class FakeBackend(yt_subs.AsrBackend):
+    calls = []
+
+    def load(self):
+        pass
+
+    def transcribe(self, audio, language=None, initial_prompt=None, on_segment=None):
+        seconds = len(audio) / SR
+        segs = [{"start": 0.0, "end": seconds / 2, "text": f"a{len(self.calls)}"},
+                {"start": seconds / 2, "end": seconds, "text": f"b{len(self.calls)}"}]
+        self.calls.append((seconds, initial_prompt))
+        res = {"text": " ".join(seg["text"] for seg in segs), "segments": []}
+        for seg in segs:
+            res["segments"].append(seg)
+            if on_segment is not None:
+                on_segment(seg)
+        return res
+
+
+class FakeStreamingBackend(FakeBackend):
+    streams_segments = True
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    def register(cls):
+        cls.calls = []
+        cls.name = cls.__name__
+        monkeypatch.setitem(yt_subs.BACKENDS, cls.name, cls)
+        monkeypatch.setattr(yt_subs, "_backends", {})
+        return yt_subs.AsrSpec(cls.name, "tiny", None, 0), cls
+
+    return register
+
+
+def test_streaming_backend_writes_each_segment(backend):
+    asr, cls = backend(FakeStreamingBackend)
+    batches = []
+    yt_subs.transcribe_incremental(np.zeros(SR * 200, dtype=np.float32), batches.append, asr=asr, chunk_seconds=60)
+    assert cls.calls == [(200.0, None)]
+    assert [[seg["text"] for seg in batch] for batch in batches] == [["a0"], ["b0"]]
+    assert batches[1][0]["start"] == 100.0
+
+
+def test_non_streaming_backend_is_chunked_with_prompt(backend):
+    asr, cls = backend(FakeBackend)
+    batches = []
+    yt_subs.transcribe_incremental(np.zeros(SR * 200, dtype=np.float32), batches.append, asr=asr, chunk_seconds=60)
+    assert len(cls.calls) > 1
+    assert cls.calls[0][1] is None
+    assert cls.calls[1][1] == "a0 b0"
+    assert [len(batch) for batch in batches] == [2] * len(cls.calls)
+    starts = [seg["start"] for batch in batches for seg in batch]
+    assert starts == sorted(starts)
+    assert sum(seconds for seconds, _ in cls.calls) == pytest.approx(200.0)
@@ -0,0 +1,150 @@
+import io
+import types
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("yt_dlp")
+pytest.importorskip("rich")
+
+import draxon
+
+MP3 = {"postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "192"}]}
+
+
+def test_single_format_exact_size():
+    [entry] = draxon.summarize_info({"id": "a", "title": "A", "format_id": "18", "filesize": 1000}, {})
+    assert entry["size"] == 1000
+    assert entry["exact"] is True
+    assert entry["disk"] == 1000
+    assert entry["transcode"] is False
+    assert entry["notes"] == []
+
+
+def test_merge_needs_double_disk():
+    info = {
+        "id": "a", "format_id": "137+140", "duration": 10,
+        "requested_formats": [
+            {"filesize": 1000, "acodec": "none"},
+            {"filesize_approx": 500, "acodec": "mp4a.40.2"},
+        ],
+    }
+    [entry] = draxon.summarize_info(info, {})
+    assert entry["title"] == "a"
+    assert entry["size"] == 1500
+    assert entry["exact"] is False
+    assert entry["disk"] == 3000
+    assert entry["notes"] == ["merge"]
+
+
+def test_size_from_bitrate_and_unknown_size():
+    [entry] = draxon.summarize_info({"id": "a", "tbr": 800, "duration": 10}, {})
+    assert entry["size"] == 800 * 1000 / 8 * 10
+    assert entry["exact"] is False
+
+    [entry] = draxon.summarize_info({"id": "b"}, {})
+    assert entry["size"] is None
+    assert entry["disk"] is None
+
+
+def test_audio_transcode_adds_output_size():
+    info = {"id": "a", "duration": 100, "filesize": 2000, "acodec": "opus"}
+    [entry] = draxon.summarize_info(info, MP3)
+    assert entry["transcode"] is True
+    assert entry["notes"] == ["opus→mp3"]
+    assert entry["disk"] == 2000 + 192 * 1000 / 8 * 100
+
+
+def test_same_codec_is_not_transcode():
+    [entry] = draxon.summarize_info({"id": "a", "filesize": 2000, "acodec": "mp3"}, MP3)
+    assert entry["transcode"] is False
+    assert entry["disk"] == 2000
+
+
+def test_playlist_entries_are_flattened():
+    info = {"entries": [
+        {"id": "a", "filesize": 1},
+        None,
+        {"entries": [{"id": "b", "filesize": 2}]},
+    ]}
+    assert [e["id"] for e in draxon.summarize_info(info, {})] == ["a", "b"]
+
+
+GIB = 1024**3
+MIB = 1024**2
+
+
+@pytest.fixture
+def planner(tmp_path, monkeypatch):
+    from rich.console import Console
+
+    final = tmp_path / "final"
+    staging = tmp_path / "staging"
+    final.mkdir()
+    staging.mkdir()
+    plans = {}
+    devices = {}
+    free = {}
+    out = io.StringIO()
+
+    def fake_resolve(url, opts, use_cache=True):
+        if isinstance(plans[url], Exception):
+            raise plans[url]
+        return plans[url]
+
+    monkeypatch.setattr(draxon, "resolve_job_plan", fake_resolve)
+    monkeypatch.setattr(draxon, "load_bandwidth", lambda: None)
+    monkeypatch.setattr(draxon, "_device", lambda p: devices.get(Path(p), 1))
+    monkeypatch.setattr(draxon.shutil, "disk_usage", lambda p: types.SimpleNamespace(free=free.get(Path(p), 1000 * GIB)))
+    monkeypatch.setattr(draxon, "console", Console(file=out, width=300))
+
+    def job(url, entries, ratelimit=None, use_staging=True):
+        plans[url] = entries
+        opts = {"outtmpl": str(final / "%(title)s.%(ext)s"),
+                "__io__": {"final_dir": str(final), "staging_dir": str(staging) if use_staging else None}}
+        if ratelimit:
+            opts["ratelimit"] = ratelimit
+        return url, opts
+
+    return types.SimpleNamespace(final=final, staging=staging, plans=plans, devices=devices, free=free,
+                                 out=out, job=job)
+
+
+def entry(size, disk=None):
+    return {"id": "x", "title": "X", "format_id": "18", "size": size, "exact": True, "disk": disk or size, "notes": []}
+
+
+def test_plan_staging_on_same_device_is_not_double_counted(planner):
+    planner.free[planner.final] = 100 * GIB
+    jobs = [planner.job("u1", [entry(40 * GIB)])]
+    cfg = {"parallel_download": True, "max_workers": 2}
+    assert draxon.plan_batch(jobs, cfg, bandwidth=10 * MIB) is True
+    assert "42.0GiB" in planner.out.getvalue()
+
+
+def test_plan_staging_on_other_device_needs_largest_job_per_worker(planner):
+    planner.devices[planner.staging] = 2
+    planner.free[planner.staging] = 50 * GIB
+    jobs = [planner.job("u1", [entry(40 * GIB)]), planner.job("u2", [entry(10 * GIB)])]
+    cfg = {"parallel_download": True, "max_workers": 2}
+    assert draxon.plan_batch(jobs, cfg, bandwidth=10 * MIB) is False
+    text = planner.out.getvalue()
+    assert "84.0GiB" in text
+    assert "не хватит места" in text
+
+
+def test_plan_eta_is_bounded_by_longest_job(planner):
+    jobs = [planner.job("u1", [entry(480 * MIB)], ratelimit=MIB), planner.job("u2", [entry(1)])]
+    planner.plans["u2"] = RuntimeError("unavailable")
+    cfg = {"parallel_download": True, "max_workers": 2}
+    assert draxon.plan_batch(jobs, cfg, bandwidth=10 * MIB) is True
+    text = planner.out.getvalue()
+    assert "~8.0 мин" in text
+    assert "(1 поток.)" in text
+    assert "Не удалось разрешить 1" in text
+
+
+def test_plan_without_speed_reports_unknown_eta(planner):
+    jobs = [planner.job("u1", [entry(MIB)], use_staging=False)]
+    assert draxon.plan_batch(jobs, {}) is True
+    assert "n/a" in planner.out.getvalue()
@@ -0,0 +1,49 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import yt_subs
+
+SR = yt_subs.SAMPLE_RATE
+
+
+def speech_with_pauses(seconds, pauses, pause_len=0.6):
+    rng = np.random.default_rng(1)
+    t = np.arange(int(seconds * SR)) / SR
+    audio = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.003 * rng.standard_normal(len(t))
+    for start in pauses:
+        audio[int(start * SR):int((start + pause_len) * SR)] = 0.003 * rng.standard_normal(int(pause_len * SR))
+    return audio.astype(np.float32)
+
+
+def assert_contiguous(splits, length):
+    assert splits[0][0] == 0
+    assert splits[-1][1] == length
+    for (_, end), (start, _) in zip(splits, splits[1:]):
+        assert end == start
+
+
+def test_short_audio_is_one_chunk():
+    audio = np.zeros(SR * 10, dtype=np.float32)
+    assert yt_subs.find_silence_splits(audio, chunk_seconds=60) == [(0, len(audio))]
+
+
+def test_cuts_land_in_pauses_near_targets():
+    pauses = [9.0, 18.5, 29.5]
+    audio = speech_with_pauses(40, pauses)
+    splits = yt_subs.find_silence_splits(audio, chunk_seconds=10, search_seconds=3)
+    assert_contiguous(splits, len(audio))
+    for start, _ in splits[1:]:
+        t = start / SR
+        assert any(p <= t <= p + 0.6 for p in pauses), t
+
+
+def test_without_pauses_cuts_stay_in_search_window():
+    audio = speech_with_pauses(40, [])
+    splits = yt_subs.find_silence_splits(audio, chunk_seconds=10, search_seconds=2)
+    assert_contiguous(splits, len(audio))
+    prev = 0.0
+    for start, _ in splits[1:]:
+        t = start / SR
+        assert prev + 8 - 0.05 <= t <= prev + 12 + 0.05
+        prev = t
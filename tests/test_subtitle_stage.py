@@ -0,0 +1,107 @@
+import types
+
+import pytest
+
+pytest.importorskip("yt_dlp")
+pytest.importorskip("rich")
+
+import draxon
+
+SEGMENTS = [{"text": "привет", "start": 0.0, "duration": 1.0}]
+
+
+class FakeYtSubs:
+    def __init__(self, transcripts):
+        self.transcripts = transcripts
+        self.lookups = []
+        self.asr = []
+
+    def extract_video_id(self, url):
+        return url.rsplit("=", 1)[-1]
+
+    def get_transcript_cached(self, vid, languages=None, translate=False):
+        self.lookups.append(vid)
+        if vid not in self.transcripts:
+            raise RuntimeError("no transcript")
+        return self.transcripts[vid]
+
+    def write_subtitles(self, transcript, out_path):
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(seg["text"] for seg in transcript))
+
+    def transcribe_audio(self, media, out_srt, language=None, asr=None):
+        self.asr.append(media)
+        with open(out_srt, "w", encoding="utf-8") as f:
+            f.write("asr")
+
+
+@pytest.fixture
+def stage_for():
+    stages = []
+
+    def make(transcripts):
+        fake = FakeYtSubs(transcripts)
+        stage = draxon.SubtitleStage(fake, ["ru"], types.SimpleNamespace(backend="whisper", model_name="tiny"))
+        stages.append(stage)
+        return fake, stage
+
+    yield make
+    for stage in stages:
+        stage.wait()
+
+
+def media(tmp_path, vid):
+    path = tmp_path / f"{vid}.mp4"
+    path.write_bytes(b"media")
+    return {"filepath": str(path), "extractor_key": "Youtube", "id": vid}
+
+
+def test_lookup_writes_srt(tmp_path, stage_for):
+    fake, stage = stage_for({"a": SEGMENTS})
+    stage.handle(media(tmp_path, "a"))
+    stage.wait()
+    assert (tmp_path / "a.srt").read_text(encoding="utf-8") == "привет"
+    assert fake.lookups == ["a"]
+    assert fake.asr == []
+
+
+def test_failed_lookup_queues_asr(tmp_path, stage_for):
+    fake, stage = stage_for({})
+    stage.handle(media(tmp_path, "b"))
+    stage.wait()
+    assert fake.asr == [str(tmp_path / "b.mp4")]
+    assert (tmp_path / "b.srt").read_text(encoding="utf-8") == "asr"
+    assert stage._active == 0
+
+
+def test_non_youtube_goes_straight_to_asr(tmp_path, stage_for):
+    fake, stage = stage_for({})
+    info = media(tmp_path, "c")
+    info["extractor_key"] = "Generic"
+    stage.handle(info)
+    stage.wait()
+    assert fake.lookups == []
+    assert fake.asr == [info["filepath"]]
+
+
+def test_existing_srt_means_no_work(tmp_path, stage_for):
+    fake, stage = stage_for({"d": SEGMENTS})
+    (tmp_path / "d.srt").write_text("old", encoding="utf-8")
+    stage.handle(media(tmp_path, "d"))
+    stage.wait()
+    assert fake.lookups == []
+    assert fake.asr == []
+    assert (tmp_path / "d.srt").read_text(encoding="utf-8") == "old"
+
+
+def test_downloaded_subtitles_mean_no_work(tmp_path, stage_for):
+    fake, stage = stage_for({"e": SEGMENTS})
+    sub = tmp_path / "e.ru.srt"
+    sub.write_text("yt-dlp", encoding="utf-8")
+    info = media(tmp_path, "e")
+    info["requested_subtitles"] = {"ru": {"filepath": str(sub)}}
+    stage.handle(info)
+    stage.wait()
+    assert fake.lookups == []
+    assert fake.asr == []
+    assert not (tmp_path / "e.srt").exists()
@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import yt_subs
+
+SEGMENTS = [
+    {"text": " Привет ", "start": 0.0, "duration": 1.25},
+    {"text": "мир", "start": 3661.5, "duration": 2.0},
+]
+
+
+def test_format_timestamp():
+    assert yt_subs.format_timestamp(3661.5) == "01:01:01,500"
+    assert yt_subs.format_timestamp(0.25, ".") == "00:00:00.250"
+
+
+def test_subtitle_paths_single_format_keeps_exact_path():
+    assert yt_subs.subtitle_paths("result.txt", ("srt",)) == {"srt": Path("result.txt")}
+    assert yt_subs.subtitle_paths("my.video", ("vtt",)) == {"vtt": Path("my.video")}
+
+
+def test_subtitle_paths_multiple_formats_swap_suffix():
+    assert yt_subs.subtitle_paths("out/abc.srt", ("srt", "vtt", "jsonl")) == {
+        "srt": Path("out/abc.srt"),
+        "vtt": Path("out/abc.vtt"),
+        "jsonl": Path("out/abc.jsonl"),
+    }
+
+
+def test_writer_streams_into_part_files(tmp_path):
+    out = tmp_path / "abc.srt"
+    writer = yt_subs.SubtitleWriter(out, ("srt", "vtt", "jsonl"))
+    writer.write_many(SEGMENTS[:1])
+    assert (tmp_path / "abc.srt.part").read_text(encoding="utf-8").startswith("1\n00:00:00,000 --> 00:00:01,250\n")
+    assert not out.exists()
+
+    writer.write_many(SEGMENTS[1:])
+    writer.close()
+    assert writer.last_end == pytest.approx(3663.5)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["abc.jsonl", "abc.srt", "abc.vtt"]
+
+    assert out.read_text(encoding="utf-8") == (
+        "1\n00:00:00,000 --> 00:00:01,250\nПривет\n\n"
+        "2\n01:01:01,500 --> 01:01:03,500\nмир\n\n"
+    )
+    assert (tmp_path / "abc.vtt").read_text(encoding="utf-8") == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:01.250\nПривет\n\n"
+        "01:01:01.500 --> 01:01:03.500\nмир\n\n"
+    )
+    rows = [json.loads(line) for line in (tmp_path / "abc.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert rows == [
+        {"index": 1, "start": 0.0, "end": 1.25, "text": "Привет"},
+        {"index": 2, "start": 3661.5, "end": 3663.5, "text": "мир"},
+    ]
+
+
+def test_writer_abort_removes_part_files(tmp_path):
+    writer = yt_subs.SubtitleWriter(tmp_path / "abc.srt", ("srt", "vtt"))
+    writer.write_many(SEGMENTS)
+    writer.abort()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_write_subtitles_keeps_previous_file_on_error(tmp_path):
+    out = tmp_path / "abc.srt"
+    out.write_text("old", encoding="utf-8")
+    with pytest.raises(AttributeError):
+        yt_subs.write_subtitles([SEGMENTS[0], None], out)
+    assert out.read_text(encoding="utf-8") == "old"
+    assert list(tmp_path.iterdir()) == [out]
@@ -0,0 +1,128 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+import yt_subs
+
+SEGMENTS = [{"text": "привет", "start": 0.0, "duration": 1.5}]
+
+
+class FakeNoTranscript(Exception):
+    pass
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    calls = []
+    outcomes = []
+
+    def fake_lookup(video_id, languages=None, translate=False):
+        calls.append(video_id)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(yt_subs, "try_get_youtube_transcript", fake_lookup)
+    monkeypatch.setattr(yt_subs, "YouTubeTranscriptApi", object())
+    monkeypatch.setattr(yt_subs, "TranscriptsDisabled", FakeNoTranscript)
+    monkeypatch.setattr(yt_subs, "NoTranscriptFound", FakeNoTranscript)
+    return calls, outcomes
+
+
+def test_transcript_cache_path_keys():
+    assert yt_subs.transcript_cache_path("/c", "abc", ["ru", "en"]) == Path("/c/abc.ru+en.orig.json")
+    assert yt_subs.transcript_cache_path("/c", "abc", None, translate=True) == Path("/c/abc.any.tr.json")
+
+
+def test_positive_result_is_cached(tmp_path, lookups):
+    calls, outcomes = lookups
+    outcomes.append(SEGMENTS)
+    assert yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path) == SEGMENTS
+    assert yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path) == SEGMENTS
+    assert calls == ["abc"]
+
+
+def test_positive_entry_expires(tmp_path, lookups):
+    calls, outcomes = lookups
+    outcomes.extend([SEGMENTS, SEGMENTS])
+    yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path)
+    path = yt_subs.transcript_cache_path(tmp_path, "abc", ["ru"])
+    entry = json.loads(path.read_text(encoding="utf-8"))
+    entry["time"] = time.time() - yt_subs.CACHE_TTL - 1
+    path.write_text(json.dumps(entry), encoding="utf-8")
+
+    yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path)
+    assert calls == ["abc", "abc"]
+
+
+def test_missing_transcript_is_cached_briefly(tmp_path, lookups):
+    calls, outcomes = lookups
+    outcomes.extend([FakeNoTranscript("no"), SEGMENTS])
+    with pytest.raises(FakeNoTranscript):
+        yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path)
+    with pytest.raises(yt_subs.CachedTranscriptMiss):
+        yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path)
+    assert calls == ["abc"]
+
+    path = yt_subs.transcript_cache_path(tmp_path, "abc", ["ru"])
+    entry = json.loads(path.read_text(encoding="utf-8"))
+    entry["time"] = time.time() - yt_subs.NEGATIVE_CACHE_TTL - 1
+    path.write_text(json.dumps(entry), encoding="utf-8")
+    assert yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path) == SEGMENTS
+
+
+def test_network_errors_are_not_cached(tmp_path, lookups):
+    calls, outcomes = lookups
+    outcomes.extend([ConnectionError("offline"), SEGMENTS])
+    with pytest.raises(ConnectionError):
+        yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path)
+    assert yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path) == SEGMENTS
+    assert calls == ["abc", "abc"]
+
+
+def test_legacy_list_entry_is_refetched(tmp_path, lookups):
+    calls, outcomes = lookups
+    outcomes.append(SEGMENTS)
+    path = yt_subs.transcript_cache_path(tmp_path, "abc", ["ru"])
+    path.write_text(json.dumps(SEGMENTS), encoding="utf-8")
+    assert yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path) == SEGMENTS
+    assert calls == ["abc"]
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    class FakeApi:
+        @staticmethod
+        def get_transcript(video_id, languages=None):
+            raise FakeNoTranscript("no manual transcript")
+
+    monkeypatch.setattr(yt_subs, "YouTubeTranscriptApi", FakeApi)
+    monkeypatch.setattr(yt_subs, "TranscriptsDisabled", FakeNoTranscript)
+    monkeypatch.setattr(yt_subs, "NoTranscriptFound", FakeNoTranscript)
+    return monkeypatch
+
+
+def test_fallback_network_error_is_not_cached(tmp_path, fake_api):
+    def offline(video_id):
+        raise ConnectionError("offline")
+
+    fake_api.setattr(yt_subs, "_list_transcripts", offline)
+    with pytest.raises(ConnectionError):
+        yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path)
+    assert not yt_subs.transcript_cache_path(tmp_path, "abc", ["ru"]).exists()
+
+
+def test_fallback_without_transcripts_is_cached(tmp_path, fake_api):
+    def disabled(video_id):
+        raise FakeNoTranscript("disabled")
+
+    fake_api.setattr(yt_subs, "_list_transcripts", disabled)
+    with pytest.raises(FakeNoTranscript):
+        yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path)
+    with pytest.raises(yt_subs.CachedTranscriptMiss):
+        yt_subs.get_transcript_cached("abc", ["ru"], cache_dir=tmp_path)
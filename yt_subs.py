@@ -1,10 +1,23 @@
 # python3 -m pip install --upgrade --user openai-whisper yt-dlp youtube-transcript-api
+# опционально, быстрый CPU-движок: python3 -m pip install --user faster-whisper
 
 import re
 import argparse
+import collections
+import concurrent.futures
+import functools
 import os
 import tempfile
 import json
+import multiprocessing
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
 from pathlib import Path
 
 try:
@@ -23,6 +36,18 @@ try:
 except Exception:
     whisper = None
 
+try:
+    import faster_whisper
+except Exception:
+    faster_whisper = None
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+SAMPLE_RATE = 16000
+
 
 def extract_video_id(url_or_id: str) -> str:
     s = url_or_id.strip()
@@ -47,20 +72,120 @@ def extract_video_id(url_or_id: str) -> str:
         return m.group(1)
     raise ValueError("Не удалось извлечь id видео из строки: " + url_or_id)
 
+SUBTITLE_FORMATS = ("srt", "vtt", "jsonl")
+
+def format_timestamp(t, sep=","):
+    h = int(t // 3600)
+    m = int((t % 3600) // 60)
+    s = int(t % 60)
+    ms = int((t - int(t)) * 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+class SubtitleSink:
+    ext = ""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.part = self.path.with_name(self.path.name + ".part")
+        self.count = 0
+        self.f = open(self.part, "w", encoding="utf-8")
+        self.write_header()
+
+    def write_header(self):
+        pass
+
+    def format_segment(self, index, seg):
+        raise NotImplementedError
+
+    def write(self, seg):
+        self.count += 1
+        self.f.write(self.format_segment(self.count, seg))
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+        os.replace(self.part, self.path)
+
+    def abort(self):
+        self.f.close()
+        try:
+            os.unlink(self.part)
+        except OSError:
+            pass
+
+class SrtSink(SubtitleSink):
+    ext = "srt"
+
+    def format_segment(self, index, seg):
+        start = seg.get("start", 0.0)
+        end = start + seg.get("duration", 0.0)
+        return f"{index}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{seg.get('text','').strip()}\n\n"
+
+class VttSink(SubtitleSink):
+    ext = "vtt"
+
+    def write_header(self):
+        self.f.write("WEBVTT\n\n")
+
+    def format_segment(self, index, seg):
+        start = seg.get("start", 0.0)
+        end = start + seg.get("duration", 0.0)
+        return f"{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{seg.get('text','').strip()}\n\n"
+
+class JsonlSink(SubtitleSink):
+    ext = "jsonl"
+
+    def format_segment(self, index, seg):
+        start = float(seg.get("start", 0.0))
+        return json.dumps({"index": index, "start": start, "end": start + float(seg.get("duration", 0.0)),
+                           "text": seg.get("text", "").strip()}, ensure_ascii=False) + "\n"
+
+SINKS = {cls.ext: cls for cls in (SrtSink, VttSink, JsonlSink)}
+
+def subtitle_paths(out_path, formats=("srt",)):
+    base = Path(out_path)
+    if len(formats) == 1:
+        # один формат — путь используется ровно как задан (--out result.txt)
+        return {formats[0]: base}
+    return {fmt: (base if base.suffix == f".{fmt}" else base.with_suffix(f".{fmt}")) for fmt in formats}
+
+class SubtitleWriter:
+    def __init__(self, out_path, formats=("srt",)):
+        self.sinks = []
+        self.last_end = 0.0
+        try:
+            for fmt, path in subtitle_paths(out_path, formats).items():
+                self.sinks.append(SINKS[fmt](path))
+        except Exception:
+            self.abort()
+            raise
+
+    def write_many(self, transcript):
+        for seg in transcript:
+            for sink in self.sinks:
+                sink.write(seg)
+            self.last_end = max(self.last_end, seg.get("start", 0.0) + seg.get("duration", 0.0))
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+            print(f"[+] {sink.ext.upper()} сохранён: {sink.path}")
+
+    def abort(self):
+        for sink in self.sinks:
+            sink.abort()
+
+def write_subtitles(transcript, out_path, formats=("srt",)):
+    writer = SubtitleWriter(out_path, formats)
+    try:
+        writer.write_many(transcript)
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+
 def save_as_srt(transcript, out_path):
-    with open(out_path, "w", encoding="utf-8") as f:
-        for i, seg in enumerate(transcript, start=1):
-            start = seg.get("start", 0.0)
-            dur = seg.get("duration", 0.0)
-            end = start + dur
-            def fmt(t):
-                h = int(t // 3600)
-                m = int((t % 3600) // 60)
-                s = int(t % 60)
-                ms = int((t - int(t)) * 1000)
-                return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
-            f.write(f"{i}\n{fmt(start)} --> {fmt(end)}\n{seg.get('text','').strip()}\n\n")
-    print(f"[+] SRT сохранён: {out_path}")
+    write_subtitles(transcript, out_path, ("srt",))
 
 
 def try_get_youtube_transcript(video_id, languages=None, translate=False):
@@ -76,7 +201,7 @@ def try_get_youtube_transcript(video_id, languages=None, translate=False):
     except Exception as e:
 
         try:
-            ts = YouTubeTranscriptApi.list_transcripts(video_id)
+            ts = _list_transcripts(video_id)
             chosen = None
             if languages:
                 for lang in languages:
@@ -105,9 +230,84 @@ def try_get_youtube_transcript(video_id, languages=None, translate=False):
                     except Exception:
                         pass
                 return chosen.fetch()
+        except (TranscriptsDisabled, NoTranscriptFound):
+            pass
+        except Exception as fallback_error:
+            # сетевая ошибка запасного пути — не повод считать, что субтитров нет
+            raise fallback_error from e
+        raise
+
+@functools.lru_cache(maxsize=512)
+def _list_transcripts(video_id):
+    return YouTubeTranscriptApi.list_transcripts(video_id)
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "yt_subs" / "transcripts"
+
+def _segment_to_dict(seg):
+    if isinstance(seg, dict):
+        return {"text": seg.get("text", ""), "start": float(seg.get("start", 0.0)), "duration": float(seg.get("duration", 0.0))}
+    return {"text": getattr(seg, "text", ""), "start": float(getattr(seg, "start", 0.0)), "duration": float(getattr(seg, "duration", 0.0))}
+
+def transcript_cache_path(cache_dir, video_id, languages=None, translate=False):
+    lang_key = "+".join(languages) if languages else "any"
+    return Path(cache_dir) / f"{video_id}.{lang_key}.{'tr' if translate else 'orig'}.json"
+
+CACHE_TTL = 7 * 24 * 3600
+NEGATIVE_CACHE_TTL = 6 * 3600
+
+class CachedTranscriptMiss(RuntimeError):
+    pass
+
+def _write_cache_entry(path, entry):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except Exception as e:
+        print("[WARN] Не удалось записать кэш транскрипта:", e)
+
+def get_transcript_cached(video_id, languages=None, translate=False, cache_dir=DEFAULT_CACHE_DIR,
+                          ttl=CACHE_TTL, negative_ttl=NEGATIVE_CACHE_TTL):
+    path = transcript_cache_path(cache_dir, video_id, languages, translate) if cache_dir else None
+    if path is not None and path.exists():
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            age = time.time() - float(entry.get("time", 0))
+            if "error" in entry and age < negative_ttl:
+                raise CachedTranscriptMiss(f"{entry['error']} (из кэша)")
+            if "transcript" in entry and age < ttl:
+                return entry["transcript"]
+        except CachedTranscriptMiss:
+            raise
         except Exception:
             pass
+
+    try:
+        raw = try_get_youtube_transcript(video_id, languages=languages, translate=translate)
+    except Exception as e:
+        # кэшируем только "субтитров нет", а не сетевые ошибки
+        if path is not None and YouTubeTranscriptApi is not None and isinstance(e, (TranscriptsDisabled, NoTranscriptFound)):
+            _write_cache_entry(path, {"time": time.time(), "error": type(e).__name__})
         raise
+    transcript = [_segment_to_dict(seg) for seg in raw]
+
+    if path is not None:
+        _write_cache_entry(path, {"time": time.time(), "transcript": transcript})
+    return transcript
+
+def fetch_transcripts(video_ids, languages=None, translate=False, max_workers=4, cache_dir=DEFAULT_CACHE_DIR):
+    results = {}
+    unique_ids = list(dict.fromkeys(video_ids))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers)) as exe:
+        futs = {exe.submit(get_transcript_cached, vid, languages, translate, cache_dir): vid for vid in unique_ids}
+        for fut in concurrent.futures.as_completed(futs):
+            vid = futs[fut]
+            try:
+                results[vid] = (fut.result(), None)
+            except Exception as e:
+                results[vid] = (None, e)
+    return results
 
 def download_audio_with_ytdlp(url, out_file):
     if yt_dlp is None:
@@ -126,96 +326,778 @@ def download_audio_with_ytdlp(url, out_file):
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         ydl.download([url])
 
-def transcribe_with_whisper(audio_path, model_name="small", language=None):
+def download_audio_wav(url, vid, tmpdir):
+    outtmpl = os.path.join(tmpdir, "%(id)s.%(ext)s")
+    print("[*] Скачиваю аудио (yt-dlp -> wav). Это может занять время...")
+    download_audio_with_ytdlp(url, outtmpl)
+
+    cand = Path(tmpdir) / f"{vid}.wav"
+    if not cand.exists():
+
+        files = list(Path(tmpdir).glob("*.wav"))
+        if files:
+            cand = files[0]
+        else:
+            raise FileNotFoundError("Не удалось найти скачанный .wav в " + tmpdir)
+    print(f"Аудиофайл: {cand}")
+    return str(cand)
+
+STREAM_PROTOCOLS = ("http", "https")
+DEFAULT_STREAM_CHUNK = 10 * 1024 * 1024
+
+def resolve_audio_stream(url):
+    if yt_dlp is None:
+        raise RuntimeError("yt-dlp не установлен. pip install yt-dlp")
+    ydl_opts = {
+        "format": "bestaudio/best",
+        "quiet": True,
+        "no_warnings": True,
+        "noplaylist": True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    fmt = info
+    if not fmt.get("url") and info.get("requested_formats"):
+        fmt = next((f for f in info["requested_formats"] if f.get("acodec") not in (None, "none")), info["requested_formats"][0])
+    if not fmt.get("url"):
+        raise RuntimeError("yt-dlp не вернул прямую ссылку на аудиопоток")
+    protocol = fmt.get("protocol") or "https"
+    if protocol not in STREAM_PROTOCOLS:
+        # m3u8/dash/... — манифест, а не файл; пусть качает сам yt-dlp
+        raise RuntimeError(f"протокол {protocol} не поддерживается потоковым режимом")
+    chunk_size = (fmt.get("downloader_options") or {}).get("http_chunk_size") or DEFAULT_STREAM_CHUNK
+    return fmt["url"], fmt.get("http_headers") or info.get("http_headers") or {}, chunk_size
+
+def iter_http_ranges(url, headers=None, chunk_size=DEFAULT_STREAM_CHUNK, timeout=30):
+    # googlevideo режет скорость для одного большого запроса, поэтому читаем
+    # кусками через Range, как это делает HTTP-загрузчик yt-dlp
+    pos = 0
+    total = None
+    while True:
+        req = urllib.request.Request(url, headers=dict(headers or {}, Range=f"bytes={pos}-{pos + chunk_size - 1}"))
+        try:
+            resp = urllib.request.urlopen(req, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and pos > 0 and total is None:
+                return
+            raise
+        with resp:
+            ranged = resp.status == 206
+            content_range = resp.headers.get("Content-Range") or ""
+            if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+                total = int(content_range.rsplit("/", 1)[1])
+            got = 0
+            while True:
+                block = resp.read(1 << 16)
+                if not block:
+                    break
+                got += len(block)
+                yield block
+        pos += got
+        if not ranged:
+            return
+        if total is not None:
+            # сервер может отдавать меньше запрошенного — ориентируемся на полный размер
+            if pos >= total:
+                return
+            if got == 0:
+                raise RuntimeError(f"поток оборвался: получено {pos} из {total} байт")
+        elif got == 0 or got < chunk_size:
+            return
+
+def decode_audio_stream(source, headers=None, sample_rate=SAMPLE_RATE, chunk_size=None):
+    if np is None:
+        raise RuntimeError("numpy не установлен.")
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg не найден в PATH")
+    cmd = ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error"]
+    if chunk_size:
+        cmd += ["-i", "pipe:0"]
+    else:
+        if headers:
+            cmd += ["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())]
+        cmd += ["-i", source]
+    cmd += ["-vn", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate), "-"]
+    if not chunk_size:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if proc.returncode != 0:
+            raise RuntimeError("ffmpeg: " + proc.stderr.decode("utf-8", "replace").strip()[-500:])
+        return np.frombuffer(proc.stdout, np.int16).astype(np.float32) / 32768.0
+
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    feed_error = []
+
+    def feed():
+        try:
+            for block in iter_http_ranges(source, headers, chunk_size):
+                proc.stdin.write(block)
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            feed_error.append(e)
+        finally:
+            try:
+                proc.stdin.close()
+            except Exception:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    stderr_chunks = []
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+    stderr_reader.start()
+    out = proc.stdout.read()
+    proc.wait()
+    feeder.join()
+    stderr_reader.join()
+    if feed_error:
+        raise RuntimeError(f"загрузка аудиопотока: {feed_error[0]}")
+    if proc.returncode != 0:
+        raise RuntimeError("ffmpeg: " + b"".join(stderr_chunks).decode("utf-8", "replace").strip()[-500:])
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+def load_audio_for_asr(url, vid, tmpdir, stream=True):
+    if stream:
+        try:
+            print("[*] Декодирую аудиопоток напрямую (yt-dlp -> ranged HTTP -> ffmpeg pipe -> 16 kHz PCM)...")
+            stream_url, headers, chunk_size = resolve_audio_stream(url)
+            audio = decode_audio_stream(stream_url, headers, chunk_size=chunk_size)
+            print(f"Аудио: {len(audio) / SAMPLE_RATE:.1f} с в памяти")
+            return audio
+        except Exception as e:
+            print("[WARN] Потоковое декодирование не удалось:", e, "— скачиваю wav")
+    return download_audio_wav(url, vid, tmpdir)
+
+_whisper_models = {}
+_whisper_models_lock = threading.Lock()
+# одна модель openai-whisper делится между потоками, а её kv-cache хуки
+# не рассчитаны на параллельные вызовы transcribe
+_whisper_transcribe_locks = collections.defaultdict(threading.Lock)
+
+def load_whisper_model(model_name="small"):
     if whisper is None:
         raise RuntimeError("whisper (openai-whisper) не установлен.")
-    print(f"Загружаю модель Whisper: {model_name}")
-    model = whisper.load_model(model_name)
+    with _whisper_models_lock:
+        model = _whisper_models.get(model_name)
+        if model is None:
+            print(f"Загружаю модель Whisper: {model_name}")
+            model = whisper.load_model(model_name)
+            _whisper_models[model_name] = model
+    return model
 
-    options = {}
-    if language:
-        options["language"] = language
-    result = model.transcribe(audio_path, **options)
+AsrSpec = collections.namedtuple("AsrSpec", "backend model_name compute_type threads")
+DEFAULT_ASR = AsrSpec("whisper", "small", None, 0)
 
-    return result
+class AsrBackend:
+    name = ""
+    compute_types = ()
+    # True — on_segment вызывается по мере декодирования, а не после всего аудио
+    streams_segments = False
 
-def main():
-    p = argparse.ArgumentParser(description="Скачать субтитры с YouTube (или сгенерировать через ASR)")
-    p.add_argument("url", help="YouTube URL или id")
-    p.add_argument("--langs", default="ru,en", help="Список языков приоритета через запятую (например: ru,en,auto)")
-    p.add_argument("--translate", action="store_true", help="Попробовать перевести субтитры в первый язык из --langs")
-    p.add_argument("--model", default="small", help="Whisper model (tiny,base,small,medium,large или turbo)")
-    p.add_argument("--out", default=None, help="Путь для сохранения .srt (по умолчанию: <videoid>.srt)")
-    p.add_argument("--keep-audio", action="store_true", help="Не удалять временный аудиофайл")
-    args = p.parse_args()
+    def __init__(self, model_name="small", compute_type=None, threads=0):
+        if compute_type and compute_type not in self.compute_types:
+            raise ValueError(f"{self.name} не поддерживает --compute-type {compute_type} "
+                             f"(доступно: {', '.join(self.compute_types)})")
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.threads = threads
+        self.model = None
+
+    def load(self):
+        raise NotImplementedError
+
+    def transcribe(self, audio, language=None, initial_prompt=None, on_segment=None):
+        raise NotImplementedError
+
+class WhisperBackend(AsrBackend):
+    name = "whisper"
+    # openai-whisper умеет только fp16/fp32; int8 есть у faster-whisper
+    compute_types = ("float16", "float32")
+
+    def load(self):
+        if self.threads:
+            try:
+                import torch
+                torch.set_num_threads(self.threads)
+            except Exception:
+                pass
+        self.model = load_whisper_model(self.model_name)
+        with _whisper_models_lock:
+            self.lock = _whisper_transcribe_locks[self.model_name]
+
+    def transcribe(self, audio, language=None, initial_prompt=None, on_segment=None):
+        options = {}
+        if language:
+            options["language"] = language
+        if initial_prompt:
+            options["initial_prompt"] = initial_prompt
+        if self.compute_type:
+            options["fp16"] = self.compute_type == "float16"
+        elif getattr(getattr(self.model, "device", None), "type", None) == "cpu":
+            options["fp16"] = False
+        with self.lock:
+            res = self.model.transcribe(audio, **options)
+        if on_segment is not None:
+            for seg in res.get("segments") or []:
+                on_segment(seg)
+        return res
 
+class FasterWhisperBackend(AsrBackend):
+    name = "faster-whisper"
+    streams_segments = True
+    compute_types = ("default", "auto", "int8", "int8_float32", "int8_float16", "int8_bfloat16",
+                     "int16", "float16", "bfloat16", "float32")
+
+    def load(self):
+        if faster_whisper is None:
+            raise RuntimeError("faster-whisper не установлен. pip install faster-whisper")
+        compute_type = self.compute_type or "int8"
+        print(f"Загружаю модель faster-whisper: {self.model_name} ({compute_type})")
+        self.model = faster_whisper.WhisperModel(self.model_name, device="cpu", compute_type=compute_type,
+                                                 cpu_threads=self.threads or 0)
+
+    def transcribe(self, audio, language=None, initial_prompt=None, on_segment=None):
+        # segments — ленивый генератор: сегмент появляется сразу после декодирования
+        segments, info = self.model.transcribe(audio, language=language, initial_prompt=initial_prompt)
+        segs = []
+        for seg in segments:
+            segs.append({"start": seg.start, "end": seg.end, "text": seg.text})
+            if on_segment is not None:
+                on_segment(segs[-1])
+        return {"text": "".join(seg["text"] for seg in segs), "segments": segs, "language": info.language}
+
+BACKENDS = {cls.name: cls for cls in (WhisperBackend, FasterWhisperBackend)}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_backend(asr=DEFAULT_ASR):
+    if asr.backend not in BACKENDS:
+        raise ValueError("Неизвестный ASR backend: " + str(asr.backend))
+    with _backends_lock:
+        backend = _backends.get(asr)
+        if backend is None:
+            backend = BACKENDS[asr.backend](asr.model_name, compute_type=asr.compute_type, threads=asr.threads)
+            backend.load()
+            _backends[asr] = backend
+    return backend
+
+def transcribe_with_whisper(audio_path, model_name="small", language=None):
+    return get_backend(DEFAULT_ASR._replace(model_name=model_name)).transcribe(audio_path, language=language)
+
+def find_silence_splits(audio, sample_rate=SAMPLE_RATE, chunk_seconds=60.0, search_seconds=5.0,
+                        frame_ms=30, min_silence_ms=200):
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    n_frames = len(audio) // frame
+    chunk_frames = max(1, int(chunk_seconds * 1000 / frame_ms))
+    if n_frames < chunk_frames * 1.5:
+        return [(0, len(audio))]
+
+    energy = np.sqrt(np.mean(audio[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    db = 20 * np.log10(energy + 1e-10)
+    # порог относительно уровня шума записи, а не абсолютный
+    floor, loud = np.percentile(db, 5), np.percentile(db, 90)
+    silent = db < min(floor + 10.0, (floor + loud) / 2)
+    search = max(1, int(search_seconds * 1000 / frame_ms))
+    min_run = max(1, int(min_silence_ms / frame_ms))
+
+    cuts = [0]
+    while n_frames - cuts[-1] >= chunk_frames * 1.5:
+        target = cuts[-1] + chunk_frames
+        lo, hi = max(cuts[-1] + 1, target - search), min(n_frames - 1, target + search)
+        best, best_len, run_start = None, 0, None
+        for i in range(lo, hi + 1):
+            if silent[i] and run_start is None:
+                run_start = i
+            if run_start is not None and (not silent[i] or i == hi):
+                run_end = i if silent[i] else i - 1
+                run_len = run_end - run_start + 1
+                if run_len >= min_run and run_len > best_len:
+                    best, best_len = (run_start + run_end) // 2, run_len
+                run_start = None
+        if best is None:
+            best = lo + int(np.argmin(db[lo:hi + 1]))
+        cuts.append(best)
+
+    bounds = [c * frame for c in cuts] + [len(audio)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _init_chunk_worker(asr):
+    get_backend(asr)
+
+def _offset_segments(res, offset, length):
+    segments = []
+    for seg in res.get("segments") or []:
+        start = min(float(seg.get("start", 0.0)), length)
+        end = min(float(seg.get("end", start)), length)
+        segments.append({"start": offset + start, "end": offset + end, "text": seg.get("text", "")})
+    return segments
+
+def _transcribe_chunk(task):
+    audio, offset, asr, language = task
+    res = get_backend(asr).transcribe(audio, language=language)
+    return _offset_segments(res, offset, len(audio) / SAMPLE_RATE)
+
+def transcribe_incremental(audio, on_segments, asr=DEFAULT_ASR, language=None, chunk_seconds=60.0):
+    backend = get_backend(asr)
+    if backend.streams_segments:
+        # движок сам отдаёт сегменты по мере декодирования — резать аудио не нужно
+        backend.transcribe(audio, language=language, on_segment=lambda seg: on_segments(segments_to_transcript([seg])))
+        return
+    prompt = None
+    for s, e in find_silence_splits(audio, chunk_seconds=chunk_seconds):
+        # хвост предыдущего фрагмента сохраняет контекст между границами
+        res = backend.transcribe(audio[s:e], language=language, initial_prompt=prompt)
+        on_segments(segments_to_transcript(_offset_segments(res, s / SAMPLE_RATE, (e - s) / SAMPLE_RATE)))
+        prompt = res.get("text", "").strip()[-200:] or None
+
+def chunk_worker_spec(asr, workers):
+    threads = asr.threads or max(1, (os.cpu_count() or 1) // max(1, workers))
+    return asr._replace(threads=threads)
+
+def create_chunk_pool(asr=DEFAULT_ASR, workers=2):
+    # пул создаётся один раз на запуск: модель загружается в каждом процессе
+    # при старте, а не заново для каждого видео
+    ctx = multiprocessing.get_context("spawn")
+    return concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                                  initializer=_init_chunk_worker,
+                                                  initargs=(chunk_worker_spec(asr, workers),))
+
+def transcribe_chunked(audio, asr=DEFAULT_ASR, language=None, workers=2, chunk_seconds=None, on_segments=None,
+                       pool=None):
+    if np is None:
+        raise RuntimeError("numpy не установлен.")
+    if isinstance(audio, (str, os.PathLike)):
+        audio = decode_audio_stream(str(audio))
+    duration = len(audio) / SAMPLE_RATE
+    if not chunk_seconds:
+        chunk_seconds = min(600.0, max(30.0, duration / (workers * 3)))
+    splits = find_silence_splits(audio, chunk_seconds=chunk_seconds)
+    own_pool = pool is None
+    if own_pool:
+        workers = max(1, min(workers, len(splits)))
+    # spec должен совпадать с тем, что передан инициализатору пула,
+    # иначе get_backend в процессе загрузит модель ещё раз
+    spec = chunk_worker_spec(asr, workers)
+    print(f"[*] {len(splits)} фрагментов по ~{chunk_seconds:.0f} с, {workers} процессов x {spec.threads} потоков ({asr.backend})")
+
+    tasks = [(audio[s:e], s / SAMPLE_RATE, spec, language) for s, e in splits]
+    if own_pool:
+        pool = create_chunk_pool(asr, workers)
+    try:
+        if on_segments is not None:
+            for chunk in pool.map(_transcribe_chunk, tasks):
+                on_segments(segments_to_transcript(chunk))
+            return None
+        chunks = list(pool.map(_transcribe_chunk, tasks))
+    finally:
+        if own_pool:
+            pool.shutdown(wait=True)
+
+    segments = sorted((seg for chunk in chunks for seg in chunk), key=lambda seg: seg["start"])
+    return {"text": " ".join(seg["text"].strip() for seg in segments), "segments": segments}
+
+def whisper_result_to_transcript(res):
+    segments = res.get("segments")
+    if not segments:
+        return [{"text": res.get("text", "").strip(), "start": 0.0, "duration": 1.0}]
+    return segments_to_transcript(segments)
+
+def segments_to_transcript(segments):
+    transcript = []
+    for seg in segments:
+        transcript.append({
+            "text": seg.get("text", "").strip(),
+            "start": float(seg.get("start", 0.0)),
+            "duration": float(seg.get("end", 0.0) - seg.get("start", 0.0)),
+        })
+    return transcript
+
+def synthetic_audio(seconds=60.0, sample_rate=SAMPLE_RATE):
+    if np is None:
+        raise RuntimeError("numpy не установлен.")
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    # речеподобный сигнал: гармоники с плавающим f0, слоги и паузы
+    f0 = 120 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = (np.sin(2 * np.pi * 3 * t) > -0.2) * (np.sin(2 * np.pi * 0.25 * t) > -0.6)
+    audio = 0.2 * voiced * envelope + 0.005 * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _benchmark_worker(asr, audio, language, out_q):
     try:
-        vid = extract_video_id(args.url)
+        t0 = time.perf_counter()
+        backend = get_backend(asr)
+        load_s = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        res = backend.transcribe(audio, language=language)
+        transcribe_s = time.perf_counter() - t1
+        out_q.put({"backend": asr.backend, "compute_type": asr.compute_type, "load_s": load_s,
+                   "transcribe_s": transcribe_s, "rtf": transcribe_s / (len(audio) / SAMPLE_RATE),
+                   "peak_mb": _peak_rss_mb(), "segments": len(res.get("segments") or [])})
     except Exception as e:
-        print("Ошибка: не удалось извлечь id видео.", e)
-        return
+        out_q.put({"backend": asr.backend, "compute_type": asr.compute_type, "error": str(e)})
 
-    langs = [x.strip() for x in args.langs.split(",") if x.strip()]
-    out_srt = args.out or f"{vid}.srt"
+def _wait_benchmark_result(proc, out_q, asr, timeout=None):
+    started = time.monotonic()
+    while True:
+        try:
+            return out_q.get(timeout=1.0)
+        except queue.Empty:
+            pass
+        if not proc.is_alive():
+            # результат мог попасть в очередь прямо перед выходом процесса
+            try:
+                return out_q.get(timeout=1.0)
+            except queue.Empty:
+                error = f"процесс завершился с кодом {proc.exitcode}"
+                break
+        if timeout and time.monotonic() - started > timeout:
+            proc.terminate()
+            error = f"превышен таймаут {timeout:.0f} с"
+            break
+    return {"backend": asr.backend, "compute_type": asr.compute_type, "error": error}
+
+def run_benchmark(specs, audio_path=None, seconds=60.0, language=None, timeout=None):
+    audio = decode_audio_stream(audio_path) if audio_path else synthetic_audio(seconds)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"Бенчмарк ASR: {audio_path or 'синтетическое аудио'}, {duration:.1f} с")
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for asr in specs:
+        # отдельный процесс на backend — чистый замер пиковой памяти
+        out_q = ctx.Queue()
+        proc = ctx.Process(target=_benchmark_worker, args=(asr, audio, language, out_q))
+        proc.start()
+        try:
+            result = _wait_benchmark_result(proc, out_q, asr, timeout)
+        finally:
+            proc.join()
+        results.append(result)
+
+    print(f"\n{'backend':<16}{'compute':<10}{'load, с':>10}{'asr, с':>10}{'RTF':>8}{'peak, MB':>10}")
+    for r in results:
+        if r.get("error"):
+            print(f"{r['backend']:<16}{str(r['compute_type'] or '-'):<10}  ошибка: {r['error']}")
+            continue
+        peak = f"{r['peak_mb']:.0f}" if r["peak_mb"] is not None else "n/a"
+        print(f"{r['backend']:<16}{str(r['compute_type'] or '-'):<10}{r['load_s']:>10.1f}{r['transcribe_s']:>10.1f}{r['rtf']:>8.2f}{peak:>10}")
+    return results
 
+def read_batch_inputs(items, file=None):
+    lines = list(items or [])
+    if file:
+        if file == "-":
+            lines.extend(sys.stdin.read().splitlines())
+        else:
+            lines.extend(Path(file).expanduser().read_text(encoding="utf-8").splitlines())
+    elif not lines and sys.stdin and not sys.stdin.isatty():
+        lines.extend(sys.stdin.read().splitlines())
+    result = []
+    seen = set()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or line in seen:
+            continue
+        seen.add(line)
+        result.append(line)
+    return result
+
+def try_youtube_subtitles(vid, langs, out_srt, translate=False, cache_dir=DEFAULT_CACHE_DIR, prefetched=None,
+                          formats=("srt",)):
     try:
-        print("Пробую получить субтитры через youtube_transcript_api (включая автогенерацию)...")
-        transcript = try_get_youtube_transcript(vid, languages=langs, translate=args.translate)
-        save_as_srt(transcript, out_srt)
+        if prefetched is not None:
+            transcript, err = prefetched
+            if err is not None:
+                raise err
+        else:
+            print("Пробую получить субтитры через youtube_transcript_api (включая автогенерацию)...")
+            transcript = get_transcript_cached(vid, languages=langs, translate=translate, cache_dir=cache_dir)
+        write_subtitles(transcript, out_srt, formats)
         print("Готово — субтитры получены напрямую с YouTube.")
-        return
+        return True
     except TranscriptsDisabled:
         print("Субтитры отключены владельцем видео.")
     except NoTranscriptFound:
         print("Субтитры не найдены (ни ручные, ни автогенерируемые).")
     except Exception as e:
         print("Не удалось получить транскрипт через API:", str(e))
+    return False
 
-    print("Переход к скачиванию аудио и локальной транскрипции (Whisper).")
+def fetch_audio(url, vid, stream=True, keep_audio=False):
     tmpdir = tempfile.mkdtemp(prefix="yt_subs_")
-    outtmpl = os.path.join(tmpdir, "%(id)s.%(ext)s")
     try:
-        audio_target = os.path.join(tmpdir, f"{vid}.wav")
-        print("[*] Скачиваю аудио (yt-dlp -> wav). Это может занять время...")
-        download_audio_with_ytdlp(args.url, outtmpl)
+        return load_audio_for_asr(url, vid, tmpdir, stream=stream and not keep_audio), tmpdir
+    except Exception:
+        release_audio(tmpdir, keep_audio)
+        raise
 
-        cand = Path(tmpdir) / f"{vid}.wav"
-        if not cand.exists():
+def release_audio(tmpdir, keep_audio=False):
+    if tmpdir and not keep_audio:
+        shutil.rmtree(tmpdir, ignore_errors=True)
 
-            files = list(Path(tmpdir).glob("*.wav"))
-            if files:
-                cand = files[0]
-            else:
-                raise FileNotFoundError("Не удалось найти скачанный .wav в " + tmpdir)
-        audio_target = str(cand)
-        print(f"Аудиофайл: {audio_target}")
-
-        res = transcribe_with_whisper(audio_target, model_name=args.model, language=(langs[0] if langs else None))
-
-        segments = res.get("segments")
-        if segments:
-            transcript = []
-            for seg in segments:
-                transcript.append({
-                    "text": seg.get("text", "").strip(),
-                    "start": float(seg.get("start", 0.0)),
-                    "duration": float(seg.get("end", 0.0) - seg.get("start", 0.0)),
-                })
-            save_as_srt(transcript, out_srt)
+def transcribe_audio(audio, out_srt, language=None, asr=DEFAULT_ASR, workers=1, chunk_seconds=None,
+                     formats=("srt",), incremental=False, pool=None):
+    if np is not None and isinstance(audio, (str, os.PathLike)) and (incremental or workers > 1):
+        audio = decode_audio_stream(str(audio))
+    writer = SubtitleWriter(out_srt, formats)
+    t0 = time.perf_counter()
+    try:
+        if workers > 1:
+            transcribe_chunked(audio, asr=asr, language=language, workers=workers,
+                               chunk_seconds=chunk_seconds, on_segments=writer.write_many, pool=pool)
+        elif incremental and np is not None:
+            print(f"[*] Пишу субтитры по мере распознавания: {', '.join(str(p) + '.part' for p in subtitle_paths(out_srt, formats).values())}")
+            transcribe_incremental(audio, writer.write_many, asr=asr, language=language,
+                                   chunk_seconds=chunk_seconds or 60.0)
         else:
-            save_as_srt([{"text": res.get("text","").strip(), "start":0.0, "duration":1.0}], out_srt)
+            res = get_backend(asr).transcribe(audio, language=language)
+            writer.write_many(whisper_result_to_transcript(res))
+    except BaseException:
+        writer.abort()
+        raise
+    elapsed = time.perf_counter() - t0
+    writer.close()
 
-        print("Транскрипция завершена.")
-    except Exception as e:
-        print("[ERROR]", e)
+    if np is not None and isinstance(audio, np.ndarray):
+        duration = len(audio) / SAMPLE_RATE
+    else:
+        duration = writer.last_end
+    rtf = f", RTF {elapsed / duration:.2f}" if duration > 0 else ""
+    print(f"Транскрипция завершена: {elapsed:.1f} с на {duration:.1f} с аудио{rtf}.")
+    return elapsed
+
+def process_video(url, langs, out_srt, translate=False, asr=DEFAULT_ASR, keep_audio=False,
+                  cache_dir=DEFAULT_CACHE_DIR, prefetched=None, stream=True, workers=1, chunk_seconds=None,
+                  formats=("srt",), incremental=False):
+    vid = extract_video_id(url)
+
+    if try_youtube_subtitles(vid, langs, out_srt, translate=translate, cache_dir=cache_dir, prefetched=prefetched,
+                             formats=formats):
+        return "youtube"
+
+    print("Переход к скачиванию аудио и локальной транскрипции (Whisper).")
+    audio, tmpdir = fetch_audio(url, vid, stream=stream, keep_audio=keep_audio)
+    try:
+        transcribe_audio(audio, out_srt, language=(langs[0] if langs else None), asr=asr,
+                         workers=workers, chunk_seconds=chunk_seconds, formats=formats, incremental=incremental)
+        return "whisper"
     finally:
-        if not args.keep_audio:
+        release_audio(tmpdir, keep_audio)
+
+def run_asr_pipeline(results, language=None, prefetch=2, stream=True, keep_audio=False,
+                     asr=DEFAULT_ASR, workers=1, chunk_seconds=None, formats=("srt",), incremental=False):
+    # загрузка следующих видео идёт, пока текущее распознаётся;
+    # slots ограничивает число скачанных, но ещё не обработанных элементов
+    slots = threading.Semaphore(max(0, prefetch) + 1)
+    ready = queue.Queue()
+    stop = threading.Event()
+
+    def producer():
+        for r in results:
+            while not slots.acquire(timeout=0.5):
+                if stop.is_set():
+                    return
+            if stop.is_set():
+                slots.release()
+                return
+            t0 = time.perf_counter()
             try:
+                audio, tmpdir = fetch_audio(r["input"], r["id"], stream=stream, keep_audio=keep_audio)
+                entry = (r, audio, tmpdir, None)
+            except Exception as e:
+                entry = (r, None, None, e)
+            r["download_seconds"] = round(time.perf_counter() - t0, 2)
+            ready.put(entry)
+        ready.put(None)
 
-                import shutil
-                shutil.rmtree(tmpdir)
-            except Exception:
-                pass
+    pool = create_chunk_pool(asr, workers) if workers > 1 else None
+    thread = threading.Thread(target=producer, name="yt_subs-download", daemon=True)
+    thread.start()
+    try:
+        while True:
+            entry = ready.get()
+            if entry is None:
+                break
+            r, audio, tmpdir, err = entry
+            t0 = time.perf_counter()
+            try:
+                print(f"\n=== Whisper: {r['input']}")
+                if err is not None:
+                    raise err
+                r["asr_seconds"] = round(transcribe_audio(audio, r["out"], language=language, asr=asr,
+                                                          workers=workers, chunk_seconds=chunk_seconds,
+                                                          formats=formats, incremental=incremental,
+                                                          pool=pool), 2)
+                r["status"] = "whisper"
+            except Exception as e:
+                r["error"] = str(e)
+                print("[ERROR]", e)
+            finally:
+                # seconds — полное время элемента: субтитры, скачивание и распознавание
+                r["seconds"] = round(r.get("seconds", 0.0) + r.get("download_seconds", 0.0)
+                                     + time.perf_counter() - t0, 2)
+                del audio
+                release_audio(tmpdir, keep_audio)
+                slots.release()
+    finally:
+        stop.set()
+        while True:
+            try:
+                entry = ready.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not None:
+                release_audio(entry[2], keep_audio)
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+def run_batch(items, langs, out_dir, translate=False, asr=DEFAULT_ASR, keep_audio=False,
+              cache_dir=DEFAULT_CACHE_DIR, jobs=4, stream=True, workers=1, chunk_seconds=None, prefetch=2,
+              formats=("srt",), incremental=False):
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results = []
+    started = time.perf_counter()
+
+    ids = []
+    for item in items:
+        try:
+            ids.append(extract_video_id(item))
+        except ValueError:
+            pass
+    print(f"Получаю субтитры для {len(ids)} видео ({jobs} потоков)...")
+    prefetched = fetch_transcripts(ids, languages=langs, translate=translate, max_workers=jobs, cache_dir=cache_dir)
+
+    need_asr = []
+    for i, item in enumerate(items, start=1):
+        print(f"\n=== [{i}/{len(items)}] {item}")
+        result = {"input": item, "id": None, "status": "error", "out": None, "error": None}
+        results.append(result)
+        t0 = time.perf_counter()
+        try:
+            vid = extract_video_id(item)
+            result["id"] = vid
+            result["out"] = str(out_dir / f"{vid}.{formats[0]}")
+            if try_youtube_subtitles(vid, langs, result["out"], translate=translate,
+                                     cache_dir=cache_dir, prefetched=prefetched.get(vid), formats=formats):
+                result["status"] = "youtube"
+            else:
+                need_asr.append(result)
+        except Exception as e:
+            result["error"] = str(e)
+            print("[ERROR]", e)
+        result["seconds"] = round(time.perf_counter() - t0, 2)
+
+    if need_asr:
+        print(f"\nЛокальная транскрипция (Whisper) нужна для {len(need_asr)} видео, предзагрузка аудио: {prefetch}")
+        run_asr_pipeline(need_asr, language=(langs[0] if langs else None), prefetch=prefetch, stream=stream,
+                         keep_audio=keep_audio, asr=asr, workers=workers, chunk_seconds=chunk_seconds,
+                         formats=formats, incremental=incremental)
+
+    ok = sum(1 for r in results if r["status"] != "error")
+    print(f"\nИтого: {ok}/{len(results)} успешно за {time.perf_counter() - started:.1f} с")
+    for r in results:
+        if r["status"] == "error":
+            print(f"  [FAIL] {r['input']}: {r['error']}")
+    return results
+
+def main():
+    p = argparse.ArgumentParser(description="Скачать субтитры с YouTube (или сгенерировать через ASR)")
+    p.add_argument("url", nargs="*", help="YouTube URL или id (можно несколько — пакетный режим)")
+    p.add_argument("-f", "--file", default=None, help="Файл со списком URL/id (по одному на строку, '-' — stdin)")
+    p.add_argument("--langs", default="ru,en", help="Список языков приоритета через запятую (например: ru,en,auto)")
+    p.add_argument("--translate", action="store_true", help="Попробовать перевести субтитры в первый язык из --langs")
+    p.add_argument("--model", default="small", help="Модель ASR (tiny,base,small,medium,large или turbo; для faster-whisper также large-v3, distil-*)")
+    p.add_argument("--backend", default="whisper", choices=sorted(BACKENDS), help="ASR движок (faster-whisper — быстрый CPU-вариант с int8)")
+    p.add_argument("--compute-type", default=None, help="Тип вычислений: int8, int8_float32, float16, float32 (по умолчанию — по движку)")
+    p.add_argument("--threads", type=int, default=0, help="Потоков CPU на модель (0 — автоматически)")
+    p.add_argument("--benchmark", nargs="?", const="", default=None, metavar="AUDIO",
+                   help="Сравнить RTF и пиковую память движков на файле AUDIO (без аргумента — синтетическое аудио)")
+    p.add_argument("--benchmark-backends", default="whisper,faster-whisper", help="Движки для --benchmark через запятую")
+    p.add_argument("--benchmark-seconds", type=float, default=60.0, help="Длина синтетического аудио для --benchmark")
+    p.add_argument("--benchmark-timeout", type=float, default=0, help="Предел времени на один движок в --benchmark, с (0 — без предела)")
+    p.add_argument("--out", default=None, help="Путь для сохранения .srt (по умолчанию: <videoid>.srt)")
+    p.add_argument("--formats", default="srt", help="Форматы вывода через запятую: srt,vtt,jsonl")
+    p.add_argument("--incremental", action="store_true", help="Распознавать фрагментами по паузам и дописывать субтитры Whisper по мере готовности")
+    p.add_argument("--out-dir", default=None, help="Папка для .srt в пакетном режиме (по умолчанию: текущая)")
+    p.add_argument("--report", default=None, help="Сохранить результаты пакетного режима в JSON")
+    p.add_argument("--keep-audio", action="store_true", help="Не удалять временный аудиофайл (отключает потоковый режим)")
+    p.add_argument("--no-stream", action="store_true", help="Скачивать аудио в .wav вместо потокового декодирования в память")
+    p.add_argument("--workers", type=int, default=1, help="Процессов Whisper: >1 — резать аудио по паузам и распознавать фрагменты параллельно")
+    p.add_argument("--chunk-seconds", type=float, default=None, help="Целевая длина фрагмента аудио (по умолчанию — автоматически)")
+    p.add_argument("--prefetch", type=int, default=2, help="Сколько видео скачивать наперёд, пока идёт распознавание (0 — последовательно)")
+    p.add_argument("--jobs", type=int, default=4, help="Потоков для получения субтитров в пакетном режиме")
+    p.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Папка кэша транскриптов")
+    p.add_argument("--no-cache", action="store_true", help="Не использовать кэш транскриптов")
+    args = p.parse_args()
+
+    langs = [x.strip() for x in args.langs.split(",") if x.strip()]
+    asr = AsrSpec(args.backend, args.model, args.compute_type, args.threads)
+    if args.compute_type and args.benchmark is None and args.compute_type not in BACKENDS[args.backend].compute_types:
+        p.error(f"{args.backend} не поддерживает --compute-type {args.compute_type} "
+                f"(доступно: {', '.join(BACKENDS[args.backend].compute_types)})")
+
+    if args.benchmark is not None:
+        names = [x.strip() for x in args.benchmark_backends.split(",") if x.strip()]
+        unknown = [name for name in names if name not in BACKENDS]
+        if unknown:
+            p.error("неизвестные движки: " + ", ".join(unknown))
+        specs = [AsrSpec(name, args.model, args.compute_type, args.threads) for name in names]
+        run_benchmark(specs, audio_path=args.benchmark or None, seconds=args.benchmark_seconds,
+                      language=(langs[0] if langs else None), timeout=args.benchmark_timeout or None)
+        return
+
+    try:
+        items = read_batch_inputs(args.url, args.file)
+    except Exception as e:
+        print("Ошибка: не удалось прочитать список видео.", e)
+        return
+    if not items:
+        p.error("нужен хотя бы один URL или id (аргументы, --file или stdin)")
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    formats = tuple(dict.fromkeys(x.strip().lower() for x in args.formats.split(",") if x.strip())) or ("srt",)
+    unknown = [fmt for fmt in formats if fmt not in SUBTITLE_FORMATS]
+    if unknown:
+        p.error("неизвестные форматы: " + ", ".join(unknown))
+
+    # пакетный режим — для нескольких видео, списка из файла/stdin или при явных --out-dir/--report
+    if len(items) > 1 or not args.url or args.file or args.out_dir or args.report:
+        results = run_batch(items, langs, args.out_dir or ".", translate=args.translate,
+                            asr=asr, keep_audio=args.keep_audio,
+                            cache_dir=cache_dir, jobs=args.jobs, stream=not args.no_stream,
+                            workers=args.workers, chunk_seconds=args.chunk_seconds, prefetch=args.prefetch,
+                            formats=formats, incremental=args.incremental)
+        if args.report:
+            Path(args.report).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+            print(f"[+] Отчёт сохранён: {args.report}")
+        return
+
+    try:
+        vid = extract_video_id(items[0])
+    except Exception as e:
+        print("Ошибка: не удалось извлечь id видео.", e)
+        return
+
+    out_srt = args.out or f"{vid}.{formats[0]}"
+    try:
+        process_video(items[0], langs, out_srt, translate=args.translate,
+                      asr=asr, keep_audio=args.keep_audio, cache_dir=cache_dir,
+                      stream=not args.no_stream, workers=args.workers, chunk_seconds=args.chunk_seconds,
+                      formats=formats, incremental=args.incremental)
+    except Exception as e:
+        print("[ERROR]", e)
 
 if __name__ == "__main__":
     main()